@@ -1,323 +1,76 @@
 import os
-import random
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session
-from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
+import io
+import csv
+import json
+import time
+import uuid
+from flask import (Flask, Blueprint, current_app, render_template, request, jsonify, redirect, url_for, flash, session,
+                   abort, g, Response, stream_with_context)
+from sqlalchemy.orm import Session
 from werkzeug.utils import secure_filename
 from datetime import datetime, timedelta
 
-# ------------------------------------------------------------------------------
-# Flask App Configuration
-# ------------------------------------------------------------------------------
-app = Flask(__name__)
-app.config['SECRET_KEY'] = 'inventory-system-secret-key-2024'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///inventory_new.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-db = SQLAlchemy(app)
+from config import configs
+from models import (db, User, Product, OrderItem, Order, ArchivedOrder, Sale, ProductSalesDaily, Customer,
+                    ProductStockShard, StockCheckpoint)
+from archive import init_archive, archive_orders_command
+from seed import seed_database, upgrade_database, init_db_command, seed_db_command
+from product_stats import (record_product_sales, record_order_sales, move_order_sales, get_top_products,
+                           rebuild_product_stats_command)
+from forecasting import get_reorder_suggestions, forecast_demand_command
+from customers import (attach_order_to_customer, detach_order_from_customer, sync_order_customer,
+                       search_customers, get_customer_orders, rebuild_customer_index_command)
+from product_search import index_product, unindex_product, search_products, rebuild_product_search_command
+from events import init_events, publish_event
+from query_profiler import init_query_profiler
+from compression import init_compression, no_compress
+from bulk_adjust import preview_adjustment, apply_adjustment, ADJUST_BATCH_SIZE
+from reconciliation import record_stock_adjustment, reconcile_stock_command
+from stock_shards import (reserve_stock, release_stock, set_product_stock, stock_totals, load_exact_stock, exact_stock,
+                          shard_stock_command, sync_stock_shards_command)
+
+bp = Blueprint('main', __name__)
 
 # ------------------------------------------------------------------------------
-# Models
+# Application Factory
 # ------------------------------------------------------------------------------
 
-class User(db.Model):
-    __tablename__ = 'users'
-   
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(100), unique=True, nullable=False)
-    password = db.Column(db.String(200), nullable=False)
-    image_url = db.Column(db.String(200), default=None)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-
-    def set_password(self, password):
-        self.password = generate_password_hash(password)
-
-    def check_password(self, password):
-        return check_password_hash(self.password, password)
-
-
-class Product(db.Model):
-    __tablename__ = 'products'
-   
-    id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
-    category = db.Column(db.String(50), nullable=False)
-    price = db.Column(db.Float, nullable=False)
-    quantity = db.Column(db.Integer, nullable=False)
-    description = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-
-class OrderItem(db.Model):
-    __tablename__ = 'order_items'
-    
-    id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
-    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
-    quantity = db.Column(db.Integer, nullable=False)
-    unit_price = db.Column(db.Float, nullable=False)
-    
-    product = db.relationship('Product', backref='order_items')
-
-
-class Order(db.Model):
-    __tablename__ = 'orders'
-    
-    id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.String(20), unique=True, nullable=False)
-    customer_name = db.Column(db.String(100), nullable=False)
-    customer_email = db.Column(db.String(100))
-    customer_phone = db.Column(db.String(20))
-    order_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
-    amount = db.Column(db.Float, nullable=False)
-    status = db.Column(db.String(20), nullable=False, default='Pending')
-    tracking_number = db.Column(db.String(50))
-    shipping_address = db.Column(db.Text)
-    notes = db.Column(db.Text)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-    
-    items = db.relationship('OrderItem', backref='order', cascade='all, delete-orphan')
-
-
-class Sale(db.Model):
-    __tablename__ = 'sales'
-   
-    id = db.Column(db.Integer, primary_key=True)
-    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
-    quantity_sold = db.Column(db.Integer, nullable=False)
-    sale_price = db.Column(db.Float, nullable=False)
-    sale_date = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    product = db.relationship('Product', backref='sales')
-
-
-# ------------------------------------------------------------------------------
-# Database Initialization
-# ------------------------------------------------------------------------------
-
-def get_order_by_id(order_id):
-    # This is a placeholder - implement based on your actual database model
-    # Example using SQLAlchemy:
-    # return Order.query.get_or_404(order_id)
-    
-    # For now, return a mock order object
-    class MockOrder:
-        def __init__(self, order_id):
-            self.id = order_id
-            self.order_id = f"ORD-{order_id:03d}"
-            self.customer_name = "John Doe"
-            self.customer_email = f"john.doe{order_id}@example.com"
-            self.order_date = datetime.now()
-            self.amount = 150.75
-            self.status = "Processing"
-            self.items = []  # You can populate this with order items
-    
-    return MockOrder(order_id)
-
-
-def init_database():
-    """Initialize the database with sample data"""
-    with app.app_context():
-        # Drop all tables and recreate them to ensure schema matches models
-        print("🔄 Recreating database tables...")
-        db.drop_all()
-        db.create_all()
-        print("✅ Created new database with all tables")
-        
-        # Create default user
-        print("📝 Creating default user...")
-        default_user = User(
-            name='Demo User',
-            email='demo@example.com',
-            image_url=None
-        )
-        default_user.set_password('password123')
-        db.session.add(default_user)
-        db.session.commit()
-        
-        # Create sample products
-        print("📦 Creating sample products...")
-        sample_products = [
-            Product(name='MacBook Pro 16"', category='Electronics', price=2499.99, quantity=15, 
-                   description='High-performance laptop for professionals with M2 Pro chip'),
-            Product(name='iMac 24"', category='Electronics', price=1299.99, quantity=8, 
-                   description='All-in-one desktop computer with 4.5K display'),
-            Product(name='iPad Pro 12.9"', category='Electronics', price=1099.99, quantity=25, 
-                   description='Professional tablet with M2 chip and Liquid Retina XDR display'),
-            Product(name='MacBook Air 13"', category='Electronics', price=999.99, quantity=20, 
-                   description='Lightweight and powerful laptop with M2 chip'),
-            Product(name='iPhone 15 Pro', category='Electronics', price=999.99, quantity=50, 
-                   description='Latest smartphone with titanium design and advanced camera'),
-            Product(name='AirPods Pro (2nd Gen)', category='Electronics', price=249.99, quantity=75, 
-                   description='Wireless noise-cancelling earbuds with MagSafe Charging Case'),
-            Product(name='Apple Watch Series 9', category='Electronics', price=399.99, quantity=30, 
-                   description='Advanced smartwatch with health tracking and S9 chip'),
-            Product(name='Gaming Laptop RTX 4070', category='Electronics', price=1799.99, quantity=8, 
-                   description='High-performance gaming laptop with RGB keyboard and 144Hz display'),
-            Product(name='Premium Cotton T-Shirt', category='Clothing', price=29.99, quantity=45, 
-                   description='Comfortable 100% organic cotton t-shirt in various colors'),
-            Product(name='Python Programming Book', category='Books', price=39.99, quantity=25, 
-                   description='Complete guide to Python programming from beginner to advanced'),
-            Product(name='Wireless Mechanical Keyboard', category='Electronics', price=129.99, quantity=15, 
-                   description='Mechanical keyboard with RGB lighting and wireless connectivity'),
-            Product(name='Noise Cancelling Headphones', category='Electronics', price=299.99, quantity=12, 
-                   description='Over-ear headphones with active noise cancellation'),
-            Product(name='Fitness Tracker Watch', category='Electronics', price=79.99, quantity=35, 
-                   description='Waterproof fitness tracker with heart rate monitoring'),
-            Product(name='Desk Lamp with Wireless Charger', category='Home', price=89.99, quantity=20, 
-                   description='LED desk lamp with built-in wireless charging pad'),
-            Product(name='Stainless Steel Water Bottle', category='Home', price=24.99, quantity=60, 
-                   description='Insulated stainless steel water bottle, keeps drinks cold for 24 hours'),
-        ]
-        
-        for product in sample_products:
-            db.session.add(product)
-        
-        db.session.flush()  # Get product IDs
-        
-        # Create sample orders
-        print("🛒 Creating sample orders...")
-        sample_orders_data = [
-            {
-                'order_id': 'ORD202401001',
-                'customer_name': 'John Smith',
-                'customer_email': 'john.smith@email.com',
-                'customer_phone': '+1-555-0101',
-                'order_date': datetime(2024, 1, 15),
-                'amount': 3749.98,
-                'status': 'Delivered',
-                'tracking_number': 'TRK789456123',
-                'shipping_address': '123 Main Street, Apt 4B\nNew York, NY 10001\nUnited States',
-                'notes': 'Customer requested signature confirmation',
-                'items': [
-                    {'product_id': 1, 'quantity': 1},  # MacBook Pro 16"
-                    {'product_id': 5, 'quantity': 1}   # iPhone 15 Pro
-                ]
-            },
-            {
-                'order_id': 'ORD202401002', 
-                'customer_name': 'Sarah Johnson',
-                'customer_email': 'sarah.j@email.com',
-                'customer_phone': '+1-555-0102',
-                'order_date': datetime(2024, 1, 18),
-                'amount': 1099.99,
-                'status': 'Shipped',
-                'tracking_number': 'TRK789456124',
-                'shipping_address': '456 Oak Avenue\nLos Angeles, CA 90210\nUnited States',
-                'notes': 'Gift wrapping requested',
-                'items': [
-                    {'product_id': 3, 'quantity': 1}   # iPad Pro
-                ]
-            },
-            {
-                'order_id': 'ORD202401003',
-                'customer_name': 'Mike Wilson',
-                'customer_email': 'mike.wilson@email.com', 
-                'customer_phone': '+1-555-0103',
-                'order_date': datetime(2024, 1, 20),
-                'amount': 648.97,
-                'status': 'Processing',
-                'tracking_number': '',
-                'shipping_address': '789 Pine Road\nChicago, IL 60601\nUnited States',
-                'notes': 'Customer will pick up from store',
-                'items': [
-                    {'product_id': 6, 'quantity': 2},  # AirPods Pro
-                    {'product_id': 10, 'quantity': 1}   # Python Book
-                ]
-            },
-            {
-                'order_id': 'ORD202401004',
-                'customer_name': 'Emily Davis',
-                'customer_email': 'emily.davis@email.com',
-                'customer_phone': '+1-555-0104',
-                'order_date': datetime(2024, 1, 22),
-                'amount': 999.99,
-                'status': 'Pending',
-                'tracking_number': '',
-                'shipping_address': '321 Elm Street\nHouston, TX 77001\nUnited States',
-                'notes': 'Waiting for payment confirmation',
-                'items': [
-                    {'product_id': 4, 'quantity': 1}   # MacBook Air
-                ]
-            },
-            {
-                'order_id': 'ORD202401005',
-                'customer_name': 'Robert Brown',
-                'customer_email': 'robert.b@email.com',
-                'customer_phone': '+1-555-0105',
-                'order_date': datetime(2024, 1, 25),
-                'amount': 399.99,
-                'status': 'Delivered',
-                'tracking_number': 'TRK789456125',
-                'shipping_address': '654 Maple Drive\nPhoenix, AZ 85001\nUnited States',
-                'notes': 'Left at front door as requested',
-                'items': [
-                    {'product_id': 7, 'quantity': 1}   # Apple Watch
-                ]
-            }
-        ]
-        
-        for order_data in sample_orders_data:
-            order = Order(
-                order_id=order_data['order_id'],
-                customer_name=order_data['customer_name'],
-                customer_email=order_data['customer_email'],
-                customer_phone=order_data['customer_phone'],
-                order_date=order_data['order_date'],
-                amount=order_data['amount'],
-                status=order_data['status'],
-                tracking_number=order_data['tracking_number'],
-                shipping_address=order_data['shipping_address'],
-                notes=order_data['notes']
-            )
-            db.session.add(order)
-            db.session.flush()
-            
-            # Add order items and update product quantities
-            for item_data in order_data['items']:
-                product = Product.query.get(item_data['product_id'])
-                if product:
-                    order_item = OrderItem(
-                        order_id=order.id,
-                        product_id=item_data['product_id'],
-                        quantity=item_data['quantity'],
-                        unit_price=product.price
-                    )
-                    db.session.add(order_item)
-                    
-                    # Update product stock (only for delivered/processing orders)
-                    if order_data['status'] in ['Delivered', 'Shipped', 'Processing']:
-                        product.quantity -= item_data['quantity']
-        
-        # Create sample sales data
-        print("📈 Creating sample sales data...")
-        for product in sample_products[:10]:  # Only for first 10 products
-            for i in range(random.randint(3, 8)):
-                sale = Sale(
-                    product_id=product.id,
-                    quantity_sold=random.randint(1, 3),
-                    sale_price=product.price * random.uniform(0.85, 0.95),
-                    sale_date=datetime(2024, 1, random.randint(1, 31))
-                )
-                db.session.add(sale)
-        
-        # Commit everything
-        db.session.commit()
-        
-        print("\n✅ Database initialization complete!")
-        print("📊 Sample data created:")
-        print(f"   👤 Users: {User.query.count()}")
-        print(f"   📦 Products: {Product.query.count()}")
-        print(f"   🛒 Orders: {Order.query.count()}")
-        print(f"   📈 Sales: {Sale.query.count()}")
-        print(f"   📋 Order Items: {OrderItem.query.count()}")
-        
-        print("\n🔑 Demo credentials:")
-        print("   Email: demo@example.com")
-        print("   Password: password123")
+def create_app(config_name=None, config_overrides=None):
+    """Build and configure a Flask application.
+
+    ``config_name`` selects a class from config.configs and defaults to the
+    INVENTORY_CONFIG environment variable. Nothing touches the database here,
+    so gunicorn can preload the app and fork workers cheaply; use the
+    ``init-db`` / ``seed-db`` CLI commands to create or reseed tables.
+    """
+    app = Flask(__name__)
+    app.config.from_object(configs[config_name or os.environ.get('INVENTORY_CONFIG', 'default')])
+    if config_overrides:
+        app.config.update(config_overrides)
+    if not app.config.get('ARCHIVE_DATABASE_PATH'):
+        app.config['ARCHIVE_DATABASE_PATH'] = os.path.join(app.instance_path, 'inventory_archive.db')
+
+    db.init_app(app)
+    init_archive(app)
+    init_events(app)
+    init_query_profiler(app)
+    init_compression(app)
+
+    app.register_blueprint(bp)
+    app.teardown_appcontext(close_analytics_session)
+
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(seed_db_command)
+    app.cli.add_command(archive_orders_command)
+    app.cli.add_command(rebuild_product_stats_command)
+    app.cli.add_command(forecast_demand_command)
+    app.cli.add_command(rebuild_customer_index_command)
+    app.cli.add_command(rebuild_product_search_command)
+    app.cli.add_command(shard_stock_command)
+    app.cli.add_command(sync_stock_shards_command)
+    app.cli.add_command(reconcile_stock_command)
+
+    return app
 
 # ------------------------------------------------------------------------------
 # Configuration
@@ -326,6 +79,19 @@ UPLOAD_FOLDER = 'static/uploads/profile_images'
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
 
+# Allowed order status transitions, keyed by current status. Used to validate
+# bulk updates so a batch can't move e.g. a Delivered order back to Pending.
+ORDER_STATUSES = ['Pending', 'Confirmed', 'Processing', 'Shipped', 'Delivered', 'Cancelled']
+ORDER_STATUS_TRANSITIONS = {
+    'Pending': {'Confirmed', 'Processing', 'Cancelled'},
+    'Confirmed': {'Pending', 'Processing', 'Cancelled'},
+    'Processing': {'Shipped', 'Cancelled'},
+    'Shipped': {'Delivered'},
+    'Delivered': set(),
+    'Cancelled': set(),
+}
+BULK_STATUS_BATCH_SIZE = 500  # keeps IN (...) lists under SQLite's variable limit
+
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -334,16 +100,124 @@ def allowed_file(filename):
 # Helper Functions
 # ------------------------------------------------------------------------------
 
+def get_analytics_session():
+    """Return a read-only ORM session on the analytics bind for this request.
+
+    Falls back to the regular session when no analytics bind is configured.
+    """
+    if 'analytics' not in db.engines:
+        return db.session
+    if 'analytics_session' not in g:
+        g.analytics_session = Session(db.engines['analytics'], autoflush=False)
+    return g.analytics_session
+
+def close_analytics_session(exception=None):
+    analytics_session = g.pop('analytics_session', None)
+    if analytics_session is not None:
+        analytics_session.close()
+
+def get_order_by_id(order_id):
+    """Look up an order by primary key, falling back to the archive.
+
+    Returns an Order, an ArchivedOrder, or None.
+    """
+    return Order.query.get(order_id) or ArchivedOrder.query.get(order_id)
+
 def get_existing_categories():
     """Get all existing categories from the database"""
     categories = db.session.query(Product.category).distinct().all()
     return [category[0] for category in categories]
 
+def apply_bulk_status_transitions(updates):
+    """Apply validated status transitions to many orders at once.
+
+    ``updates`` is a list of dicts with ``id``, ``status`` and an optional
+    ``tracking_number``. Orders are grouped by target status and each group is
+    written with one set-based UPDATE (per batch of BULK_STATUS_BATCH_SIZE ids).
+    The caller is responsible for committing or rolling back the session.
+    Returns one result dict per requested order.
+    """
+    requested = {}
+    results = {}
+    for update in updates:
+        try:
+            order_pk = int(update['id'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        requested[order_pk] = (update.get('status'), (update.get('tracking_number') or '').strip())
+
+    # One SELECT to validate every requested transition
+    current = {}
+    order_ids = list(requested)
+    for start in range(0, len(order_ids), BULK_STATUS_BATCH_SIZE):
+        batch = order_ids[start:start + BULK_STATUS_BATCH_SIZE]
+        current.update(db.session.query(Order.id, Order.status).filter(Order.id.in_(batch)).all())
+
+    groups = {}
+    for order_pk, (target, tracking) in requested.items():
+        source = current.get(order_pk)
+        if source is None:
+            message = 'Order not found'
+        elif target not in ORDER_STATUSES:
+            message = f'Invalid status: {target}'
+        elif target == source:
+            message = f'Order is already {source}'
+        elif target not in ORDER_STATUS_TRANSITIONS.get(source, set()):
+            message = f'Cannot change status from {source} to {target}'
+        else:
+            groups.setdefault(target, {})[order_pk] = tracking
+            results[order_pk] = {'id': order_pk, 'success': True, 'from': source, 'to': target,
+                                 'message': f'{source} → {target}'}
+            continue
+        results[order_pk] = {'id': order_pk, 'success': False, 'message': message}
+
+    for target, members in groups.items():
+        # Re-check the source status in the WHERE clause so a concurrent edit
+        # between the SELECT above and this UPDATE can't sneak past validation.
+        allowed_sources = [status for status, targets in ORDER_STATUS_TRANSITIONS.items() if target in targets]
+        member_ids = list(members)
+        for start in range(0, len(member_ids), BULK_STATUS_BATCH_SIZE):
+            batch = member_ids[start:start + BULK_STATUS_BATCH_SIZE]
+            values = {'status': target}
+            tracking = {order_pk: members[order_pk] for order_pk in batch if members[order_pk]}
+            if tracking:
+                values['tracking_number'] = db.case(tracking, value=Order.id, else_=Order.tracking_number)
+            updated = Order.query.filter(
+                Order.id.in_(batch),
+                Order.status.in_(allowed_sources)
+            ).update(values, synchronize_session=False)
+            if updated == len(batch):
+                continue
+
+            # Some rows changed under us and the WHERE clause skipped them;
+            # find out which so they aren't reported (or broadcast) as done.
+            statuses = dict(db.session.query(Order.id, Order.status).filter(Order.id.in_(batch)).all())
+            for order_pk in batch:
+                status = statuses.get(order_pk)
+                if status != target:
+                    message = ('Order not found' if status is None
+                               else f'Order changed to {status} during the update')
+                    results[order_pk] = {'id': order_pk, 'success': False, 'message': message}
+
+    return [results[order_pk] for order_pk in requested]
+
+def publish_order_updated(order, previous_status, previous_amount):
+    """Broadcast an edited order's status and revenue change to live views."""
+    publish_event('order_updated', {
+        'id': order.id,
+        'order_id': order.order_id,
+        'status': order.status,
+        'previous_status': previous_status,
+        'revenue_delta': (order.amount or 0) - (previous_amount or 0)
+    })
+
 def get_dashboard_data():
     """Generate comprehensive dashboard data"""
     try:
+        analytics = get_analytics_session()
+
         # Get all products
-        products = Product.query.order_by(Product.created_at.desc()).all()
+        products = load_exact_stock(analytics.query(Product).order_by(Product.created_at.desc()).all(), analytics)
         
         # Product statistics
         total_products = len(products)
@@ -351,15 +225,24 @@ def get_dashboard_data():
         out_of_stock = len([p for p in products if p.quantity == 0])
         
         # Sales data - now using Order model
-        orders = Order.query.all()
-        total_orders = len(orders)
-        total_revenue = sum(order.amount for order in orders)
+        total_orders, total_revenue = analytics.query(
+            db.func.count(Order.id),
+            db.func.coalesce(db.func.sum(Order.amount), 0)
+        ).one()
+        # Archived orders still count; the archive is only attached to the
+        # primary engine, so read it there
+        archived_orders, archived_revenue = db.session.query(
+            db.func.count(ArchivedOrder.id),
+            db.func.coalesce(db.func.sum(ArchivedOrder.amount), 0)
+        ).one()
+        total_orders += archived_orders
+        total_revenue += archived_revenue
         
         # Customer count
-        total_customers = User.query.count()
+        total_customers = analytics.query(User).count()
         
         # Recent orders - using the new Order model
-        recent_orders = Order.query.order_by(Order.order_date.desc()).limit(5).all()
+        recent_orders = analytics.query(Order).order_by(Order.order_date.desc()).limit(5).all()
         
         # Category distribution - FIXED: Simple count only
         categories = {}
@@ -368,23 +251,16 @@ def get_dashboard_data():
                 categories[product.category] = 0  # Just store count as integer
             categories[product.category] += 1
         
-        # Product performance data
-        product_performance = [
-            {'name': 'MacBook Pro 16"', 'percentage': 49},
-            {'name': 'iMac 24"', 'percentage': 19},
-            {'name': 'iPad Pro 12.9"', 'percentage': 29},
-            {'name': 'MacBook Air 13"', 'percentage': 56}
-        ]
-        
-        # Email statistics
-        email_stats = [
-            {'type': 'Marketing', 'percentage': 70},
-            {'type': 'Promotions', 'percentage': 45},
-            {'type': 'Newsletter', 'percentage': 45}
-        ]
+        # Best sellers from the incrementally maintained daily counters
+        performance_window_days = current_app.config['PRODUCT_PERFORMANCE_WINDOW_DAYS']
+        product_performance = get_top_products(
+            limit=current_app.config['PRODUCT_PERFORMANCE_TOP_N'],
+            days=performance_window_days,
+            session=analytics
+        )
         
         # Delivery statistics based on actual order status
-        status_counts = db.session.query(
+        status_counts = analytics.query(
             Order.status,
             db.func.count(Order.id).label('count')
         ).group_by(Order.status).all()
@@ -413,7 +289,7 @@ def get_dashboard_data():
             'total_customers': total_customers,
             'recent_orders': recent_orders,
             'product_performance': product_performance,
-            'email_stats': email_stats,
+            'performance_window_days': performance_window_days,
             'delivery_stats': delivery_stats,
             'categories': categories,  # Now this is simple category: count
             'months': months,
@@ -433,7 +309,7 @@ def get_dashboard_data():
             'total_customers': 0,
             'recent_orders': [],
             'product_performance': [],
-            'email_stats': [],
+            'performance_window_days': 0,
             'delivery_stats': [],
             'categories': {},
             'months': ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
@@ -445,13 +321,13 @@ def get_dashboard_data():
 # Routes
 # ------------------------------------------------------------------------------
 
-@app.route('/')
+@bp.route('/')
 def home():
-    return redirect(url_for('login'))
+    return redirect(url_for('main.login'))
 
 # ------------------------- Authentication -------------------------------------
 
-@app.route('/login', methods=['GET', 'POST'])
+@bp.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         email = request.form['email']
@@ -464,13 +340,13 @@ def login():
             session['user_email'] = user.email
             session['user_image'] = user.image_url
             flash('Login successful!', 'success')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
         else:
             flash('Invalid email or password', 'error')
 
     return render_template('login.html')
 
-@app.route('/register', methods=['GET', 'POST'])
+@bp.route('/register', methods=['GET', 'POST'])
 def register():
     if request.method == 'POST':
         name = request.form['name']
@@ -489,54 +365,93 @@ def register():
             db.session.add(new_user)
             db.session.commit()
             flash('Registration successful! Please login.', 'success')
-            return redirect(url_for('login'))
+            return redirect(url_for('main.login'))
         except Exception as e:
             db.session.rollback()
             flash('Error creating account. Please try again.', 'error')
    
     return render_template('register.html')
 
-@app.route('/logout')
+@bp.route('/logout')
 def logout():
     session.clear()
     flash('Logged out successfully', 'success')
-    return redirect(url_for('login'))
+    return redirect(url_for('main.login'))
 
 # ------------------------- Dashboard -----------------------------------------
 
-@app.route('/dashboard')
+@bp.route('/dashboard')
 def dashboard():
     if 'user_id' not in session:
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
    
+    # Take the event offset before reading, so the live stream replays any
+    # change committed while the page is rendered
+    event_offset = current_app.extensions['event_channel'].current_offset()
     dashboard_data = get_dashboard_data()
-    return render_template('dashboard.html', **dashboard_data)
+    return render_template('dashboard.html', event_offset=event_offset, **dashboard_data)
+
+# ------------------------- Live Updates --------------------------------------
+
+@bp.route('/events/stream')
+@no_compress  # compressor buffering would delay events
+def event_stream():
+    """Server-Sent Events feed of stock, order and revenue deltas.
+
+    Reads only the shared event log, never the database, so an open dashboard
+    costs nothing until something actually changes. Pages pass the log offset
+    they were rendered at as ``?offset=``; browsers resume from the
+    Last-Event-ID header after a dropped connection. Each stream ends after
+    EVENT_STREAM_MAX_SECONDS so it can't hold a sync worker indefinitely.
+    """
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'message': 'Not authenticated'}), 401
+
+    channel = current_app.extensions['event_channel']
+    heartbeat = current_app.config['EVENT_STREAM_HEARTBEAT_SECONDS']
+    max_seconds = current_app.config['EVENT_STREAM_MAX_SECONDS']
+    last_event_id = request.headers.get('Last-Event-ID', '') or request.args.get('offset', '')
+    offset = int(last_event_id) if last_event_id.isdigit() else None
+
+    def generate():
+        deadline = time.monotonic() + max_seconds
+        yield 'retry: 3000\n\n'
+        for event_offset, event in channel.follow(offset, heartbeat=heartbeat):
+            if time.monotonic() >= deadline:
+                break  # the browser reconnects from its last event id
+            if event is None:
+                yield ': heartbeat\n\n'
+                continue
+            payload = json.dumps(event['data'], default=str)
+            yield f"id: {event_offset}\nevent: {event['type']}\ndata: {payload}\n\n"
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+    return response
 
 # ------------------------- Order Management ---------------------------------
 
-@app.route('/orders')
+@bp.route('/orders')
 def orders():
     if 'user_id' not in session:
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
    
     orders_list = Order.query.order_by(Order.order_date.desc()).all()
     return render_template('recent_orders.html', orders=orders_list)
 
-@app.route('/create_order', methods=['GET', 'POST'])
+@bp.route('/create_order', methods=['GET', 'POST'])
 def create_order():
     if 'user_id' not in session:
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
    
-    products = Product.query.all()
-    
     if request.method == 'POST':
         try:
-            # Generate unique order ID
-            order_id = f"ORD{datetime.now().strftime('%Y%m%d%H%M%S')}"
-            
-            # Create order
+            # Create order under a placeholder number; the real one is
+            # derived from the primary key below so concurrent orders can't
+            # collide on it
             new_order = Order(
-                order_id=order_id,
+                order_id=uuid.uuid4().hex[:20],
                 customer_name=request.form['customer_name'],
                 customer_email=request.form.get('customer_email', ''),
                 customer_phone=request.form.get('customer_phone', ''),
@@ -550,9 +465,12 @@ def create_order():
             
             db.session.add(new_order)
             db.session.flush()  # Get the order ID
+            order_id = f"ORD{new_order.order_date:%Y%m%d}-{new_order.id:06d}"
+            new_order.order_id = order_id
             
             # Process order items
             total_amount = 0
+            sold_items = []
             product_ids = request.form.getlist('product_id[]')
             quantities = request.form.getlist('quantity[]')
             
@@ -564,11 +482,13 @@ def create_order():
                 quantity = int(quantity_str)
                 
                 if product and quantity > 0:
-                    # Check stock availability
-                    if product.quantity < quantity:
-                        flash(f'Not enough stock for {product.name}. Available: {product.quantity}', 'error')
+                    # Check and take stock in one conditional UPDATE (on a
+                    # shard row for sharded hot products)
+                    if not reserve_stock(product, quantity):
                         db.session.rollback()
-                        return render_template('add_order.html', products=products)
+                        available = stock_totals([int(product_id)]).get(int(product_id), 0)
+                        flash(f'Not enough stock for {product.name}. Available: {available}', 'error')
+                        return render_template('add_order.html', datetime=datetime)
                     
                     # Create order item
                     order_item = OrderItem(
@@ -579,35 +499,47 @@ def create_order():
                     )
                     
                     db.session.add(order_item)
+                    sold_items.append((product.id, quantity, product.price))
                     total_amount += product.price * quantity
-                    
-                    # Update product stock
-                    product.quantity -= quantity
             
             # Update order total amount
             new_order.amount = total_amount
+            stock_levels = stock_totals({product_id for product_id, _, _ in sold_items})
+            record_product_sales(new_order.order_date.date(), sold_items)
+            attach_order_to_customer(new_order)
             
             db.session.commit()
+            publish_event('order_created', {
+                'id': new_order.id,
+                'order_id': order_id,
+                'status': new_order.status,
+                'revenue_delta': total_amount,
+                'stock': [{'id': pid, 'quantity': qty} for pid, qty in stock_levels.items()]
+            })
             flash(f'Order {order_id} created successfully!', 'success')
-            return redirect(url_for('orders'))
+            return redirect(url_for('main.orders'))
             
         except Exception as e:
             db.session.rollback()
             flash(f'Error creating order: {str(e)}', 'error')
     
-    return render_template('add_order.html', products=products, datetime=datetime)
+    return render_template('add_order.html', datetime=datetime)
 
-@app.route('/edit_order/<int:order_id>', methods=['GET', 'POST'])
+@bp.route('/edit_order/<int:order_id>', methods=['GET', 'POST'])
 def edit_order(order_id):
     if 'user_id' not in session:
         if request.is_json:
             return jsonify({'success': False, 'message': 'Not authenticated'})
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
    
     order = Order.query.get_or_404(order_id)
     
     if request.method == 'POST':
         try:
+            previous_order_date = order.order_date
+            previous_amount = order.amount
+            previous_status = order.status
+            
             # Check if it's a JSON request (from recent-orders modal)
             if request.is_json:
                 data = request.get_json()
@@ -616,8 +548,11 @@ def edit_order(order_id):
                 order.order_date = datetime.strptime(data['orderDate'], '%Y-%m-%d')
                 order.amount = data['orderAmount']
                 order.status = data['orderStatus']
+                move_order_sales(order, previous_order_date)
+                sync_order_customer(order, previous_amount)
                 
                 db.session.commit()
+                publish_order_updated(order, previous_status, previous_amount)
                 return jsonify({'success': True, 'message': 'Order updated successfully!'})
             else:
                 # Regular form submission (from edit-order page)
@@ -630,10 +565,13 @@ def edit_order(order_id):
                 order.shipping_address = request.form.get('shippingAddress', '')
                 order.notes = request.form.get('orderNotes', '')
                 order.amount = float(request.form.get('orderAmount', order.amount))
+                move_order_sales(order, previous_order_date)
+                sync_order_customer(order, previous_amount)
                 
                 db.session.commit()
+                publish_order_updated(order, previous_status, previous_amount)
                 flash('Order updated successfully!', 'success')
-                return redirect(url_for('recent_orders'))
+                return redirect(url_for('main.recent_orders'))
             
         except Exception as e:
             db.session.rollback()
@@ -645,7 +583,7 @@ def edit_order(order_id):
     # For GET requests, render the edit form
     return render_template('edit_order.html', order=order)
 
-@app.route('/delete_order/<int:order_id>', methods=['POST'])
+@bp.route('/delete_order/<int:order_id>', methods=['POST'])
 def delete_order(order_id):
     if 'user_id' not in session:
         return jsonify({'success': False, 'message': 'Not authenticated'})
@@ -653,34 +591,200 @@ def delete_order(order_id):
     try:
         order = Order.query.get_or_404(order_id)
         order_id_str = order.order_id
+        order_amount = order.amount or 0
         
         # Restore product quantities
+        restored_ids = set()
         for item in order.items:
             product = Product.query.get(item.product_id)
             if product:
-                product.quantity += item.quantity
+                release_stock(product, item.quantity)
+                restored_ids.add(product.id)
+        record_order_sales(order, sign=-1)
+        detach_order_from_customer(order)
+        stock_levels = stock_totals(restored_ids)
         
         db.session.delete(order)
         db.session.commit()
+        publish_event('order_deleted', {
+            'id': order_id,
+            'order_id': order_id_str,
+            'revenue_delta': -order_amount,
+            'stock': [{'id': pid, 'quantity': qty} for pid, qty in stock_levels.items()]
+        })
         return jsonify({'success': True, 'message': f'Order {order_id_str} deleted successfully'})
     except Exception as e:
         db.session.rollback()
         return jsonify({'success': False, 'message': f'Error deleting order: {str(e)}'})
 
-@app.route('/order_details/<int:order_id>')
+@bp.route('/orders/bulk_status', methods=['POST'])
+def bulk_update_order_status():
+    """Move many orders to a new status in one request and one transaction.
+
+    Accepts either ``{"orderIds": [...], "status": "Shipped",
+    "trackingNumbers": {"<id>": "TRK..."}}`` or an explicit
+    ``{"updates": [{"id": 1, "status": "Shipped", "trackingNumber": "..."}]}``.
+    """
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'message': 'Not authenticated'})
+
+    data = request.get_json(silent=True) or {}
+    if 'updates' in data:
+        updates = [
+            {'id': u.get('id'), 'status': u.get('status'), 'tracking_number': u.get('trackingNumber')}
+            for u in data['updates'] if isinstance(u, dict)
+        ]
+    else:
+        tracking_numbers = data.get('trackingNumbers') or {}
+        updates = [
+            {'id': order_pk, 'status': data.get('status'),
+             'tracking_number': tracking_numbers.get(str(order_pk))}
+            for order_pk in data.get('orderIds', [])
+        ]
+
+    if not updates:
+        return jsonify({'success': False, 'message': 'No orders selected'})
+
+    try:
+        results = apply_bulk_status_transitions(updates)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Error updating orders: {str(e)}'})
+
+    changed = [{'id': r['id'], 'status': r['to'], 'previous_status': r['from']} for r in results if r['success']]
+    if changed:
+        publish_event('order_status_changed', {'orders': changed})
+
+    updated = len(changed)
+    return jsonify({
+        'success': True,
+        'message': f'{updated} of {len(results)} orders updated',
+        'updated': updated,
+        'results': results
+    })
+
+@bp.route('/order_details/<int:order_id>')
 def order_details(order_id):
     if 'user_id' not in session:
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
    
-    order = Order.query.get_or_404(order_id)
+    order = get_order_by_id(order_id)
+    if order is None:
+        abort(404)
     return render_template('order_details.html', order=order)
 
+@bp.route('/export/order/<int:order_id>')
+def export_order(order_id):
+    """Export a single order (live or archived) as JSON."""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'message': 'Not authenticated'})
+   
+    order = get_order_by_id(order_id)
+    if order is None:
+        abort(404)
+    return jsonify({
+        'id': order.id,
+        'order_id': order.order_id,
+        'customer_name': order.customer_name,
+        'customer_email': order.customer_email,
+        'customer_phone': order.customer_phone,
+        'order_date': order.order_date.isoformat(),
+        'amount': float(order.amount),
+        'status': order.status,
+        'tracking_number': order.tracking_number,
+        'shipping_address': order.shipping_address,
+        'notes': order.notes,
+        'archived': order.is_archived,
+        'items': [{
+            'product_id': item.product_id,
+            'product_name': item.product.name if item.product else None,
+            'quantity': item.quantity,
+            'unit_price': float(item.unit_price)
+        } for item in order.items]
+    })
+
+@bp.route('/export/orders.csv')
+def export_orders_csv():
+    """Stream every live and archived order as CSV without loading them all."""
+    if 'user_id' not in session:
+        return redirect(url_for('main.login'))
+
+    columns = ['order_id', 'customer_name', 'customer_email', 'customer_phone', 'order_date',
+               'amount', 'status', 'tracking_number', 'shipping_address']
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns + ['archived'])
+        for model in (Order, ArchivedOrder):
+            query = db.session.query(*[getattr(model, column) for column in columns]).order_by(model.order_date)
+            for i, row in enumerate(query.yield_per(500), 1):
+                writer.writerow(list(row) + [model.is_archived])
+                if i % 500 == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+        yield buffer.getvalue()
+
+    response = Response(stream_with_context(generate()), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename=orders_{datetime.now():%Y%m%d}.csv'
+    return response
+
+# ------------------------- Customers -----------------------------------------
+
+@bp.route('/customers/search')
+def customer_search():
+    """Prefix search over customer email and name for order-form autocomplete."""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'message': 'Not authenticated'})
+   
+    customers = search_customers(request.args.get('q', ''), limit=min(request.args.get('limit', 10, type=int), 50))
+    return jsonify({
+        'success': True,
+        'customers': [{
+            'id': c.id,
+            'name': c.name,
+            'email': c.email,
+            'phone': c.phone,
+            'order_count': c.order_count,
+            'lifetime_value': round(c.lifetime_value or 0, 2)
+        } for c in customers]
+    })
+
+@bp.route('/customers/<int:customer_id>/orders')
+def customer_orders(customer_id):
+    """All live and archived orders for one customer."""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'message': 'Not authenticated'})
+   
+    customer = Customer.query.get_or_404(customer_id)
+    return jsonify({
+        'success': True,
+        'customer': {
+            'id': customer.id,
+            'name': customer.name,
+            'email': customer.email,
+            'phone': customer.phone,
+            'order_count': customer.order_count,
+            'lifetime_value': round(customer.lifetime_value or 0, 2)
+        },
+        'orders': [{
+            'id': order.id,
+            'order_id': order.order_id,
+            'order_date': order.order_date.isoformat(),
+            'amount': float(order.amount),
+            'status': order.status,
+            'archived': order.is_archived
+        } for order in get_customer_orders(customer_id)]
+    })
+
 # ------------------------- Product Management ---------------------------------
 
-@app.route('/add_product', methods=['GET', 'POST'])
+@bp.route('/add_product', methods=['GET', 'POST'])
 def add_product():
     if 'user_id' not in session:
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
    
     existing_categories = get_existing_categories()
     
@@ -716,7 +820,7 @@ def add_product():
             existing_product = Product.query.filter_by(name=name).first()
             if existing_product:
                 flash(f'Product "{name}" already exists! You can edit it from the inventory.', 'warning')
-                return redirect(url_for('edit_product', product_id=existing_product.id))
+                return redirect(url_for('main.edit_product', product_id=existing_product.id))
            
             new_product = Product(
                 name=name,
@@ -727,9 +831,11 @@ def add_product():
             )
 
             db.session.add(new_product)
+            db.session.flush()
+            index_product(new_product)
             db.session.commit()
             flash(f'Product "{name}" added to category "{category}" successfully!', 'success')
-            return redirect(url_for('inventory'))
+            return redirect(url_for('main.inventory'))
         except ValueError:
             db.session.rollback()
             flash('Invalid price or quantity format. Please enter valid numbers.', 'error')
@@ -740,20 +846,42 @@ def add_product():
     return render_template('add_product.html', existing_categories=existing_categories)
 
 
-@app.route('/inventory')
+@bp.route('/products/search')
+def product_search():
+    """Typeahead for the order form: top products matching ``q`` with price
+    and available stock."""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'message': 'Not authenticated'})
+   
+    products = search_products(request.args.get('q', ''), limit=min(request.args.get('limit', 10, type=int), 50))
+    load_exact_stock(products)
+    return jsonify({
+        'success': True,
+        'products': [{
+            'id': p.id,
+            'name': p.name,
+            'category': p.category,
+            'price': float(p.price),
+            'quantity': p.quantity
+        } for p in products]
+    })
+
+
+@bp.route('/inventory')
 def inventory():
     if 'user_id' not in session:
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
 
-    products = Product.query.order_by(Product.created_at.desc()).all()
+    event_offset = current_app.extensions['event_channel'].current_offset()
+    products = load_exact_stock(Product.query.order_by(Product.created_at.desc()).all())
     # Get unique categories for the filter dropdown
     categories = db.session.query(Product.category).distinct().all()
     categories = [category[0] for category in categories if category[0]]  # Remove any None values
 
-    return render_template('inventory.html', products=products, categories=categories)
+    return render_template('inventory.html', products=products, categories=categories, event_offset=event_offset)
 
 
-@app.route('/edit_product/<int:product_id>', methods=['GET', 'POST'])
+@bp.route('/edit_product/<int:product_id>', methods=['GET', 'POST'])
 def edit_product(product_id):
     product = Product.query.get_or_404(product_id)
 
@@ -767,15 +895,72 @@ def edit_product(product_id):
         product.description = request.form['description']
         product.category = request.form['category']
         product.price = float(request.form['price'])
-        product.quantity = int(request.form['quantity'])
+        new_quantity = int(request.form['quantity'])
+        previous_quantity = stock_totals([product.id])[product.id]
+        set_product_stock(product, new_quantity)
+        record_stock_adjustment([product.id], new_quantity - previous_quantity)
+        index_product(product)
         
         db.session.commit()
+        publish_event('stock_changed', {'stock': [{'id': product.id, 'quantity': product.quantity}]})
         flash('Product updated successfully!', 'success')
-        return redirect(url_for('inventory'))
+        return redirect(url_for('main.inventory'))
     
+    load_exact_stock([product])
     return render_template('edit_product.html', product=product, existing_categories=existing_categories)
 
-@app.route('/delete_product/<int:product_id>', methods=['POST'])
+@bp.route('/products/bulk_adjust', methods=['GET', 'POST'])
+def bulk_adjust_products():
+    """Preview (``dryRun``, the default) or apply a price/stock change to every
+    product matching a category, name pattern and/or id list."""
+    if 'user_id' not in session:
+        if request.is_json:
+            return jsonify({'success': False, 'message': 'Not authenticated'})
+        return redirect(url_for('main.login'))
+
+    if request.method == 'GET':
+        return render_template('bulk_adjust.html', categories=get_existing_categories())
+
+    data = request.get_json(silent=True) or {}
+    field, mode, amount = data.get('field'), data.get('mode'), data.get('amount')
+    selection = {
+        'category': data.get('category') or None,
+        'name_pattern': (data.get('namePattern') or '').strip() or None,
+        'product_ids': data.get('productIds') or None
+    }
+
+    try:
+        if data.get('dryRun', True):
+            return jsonify({'success': True, 'preview': preview_adjustment(field, mode, amount, **selection)})
+        adjustment, changed_ids = apply_adjustment(field, mode, amount, user_id=session['user_id'], **selection)
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': str(e)})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': f'Error adjusting products: {str(e)}'})
+
+    if field == 'quantity':
+        # Keep each live update small: one event per batch of products
+        for start in range(0, len(changed_ids), ADJUST_BATCH_SIZE):
+            stock_levels = stock_totals(changed_ids[start:start + ADJUST_BATCH_SIZE])
+            publish_event('stock_changed', {
+                'stock': [{'id': pid, 'quantity': qty} for pid, qty in stock_levels.items()]
+            })
+
+    return jsonify({
+        'success': True,
+        'message': f'{adjustment.products_affected} products updated',
+        'adjustment': {
+            'id': adjustment.id,
+            'products_affected': adjustment.products_affected,
+            'total_before': round(adjustment.total_before, 2),
+            'total_after': round(adjustment.total_after, 2)
+        }
+    })
+
+@bp.route('/delete_product/<int:product_id>', methods=['POST'])
 def delete_product(product_id):
     if 'user_id' not in session:
         return jsonify({'success': False, 'message': 'Not authenticated'})
@@ -787,10 +972,15 @@ def delete_product(product_id):
         # Delete related records first to avoid foreign key constraints
         OrderItem.query.filter_by(product_id=product_id).delete()
         Sale.query.filter_by(product_id=product_id).delete()
+        ProductSalesDaily.query.filter_by(product_id=product_id).delete()
+        ProductStockShard.query.filter_by(product_id=product_id).delete()
+        StockCheckpoint.query.filter_by(product_id=product_id).delete()
+        unindex_product(product_id)
         
         # Now delete the product
         db.session.delete(product)
         db.session.commit()
+        publish_event('product_deleted', {'id': product_id})
         
         return jsonify({
             'success': True, 
@@ -807,12 +997,13 @@ def delete_product(product_id):
 
 # ------------------------- Reports -------------------------------------------
 
-@app.route('/report')
+@bp.route('/report')
 def report():
     if 'user_id' not in session:
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
    
-    products = Product.query.all()
+    analytics = get_analytics_session()
+    products = load_exact_stock(analytics.query(Product).all(), analytics)
     total_count = len(products)
     total_value = sum(p.price * p.quantity for p in products)
    
@@ -823,7 +1014,7 @@ def report():
         categories[p.category]['count'] += 1
         categories[p.category]['value'] += p.price * p.quantity
    
-    low_stock_items = Product.query.filter(Product.quantity < 10).all()
+    low_stock_items = load_exact_stock(analytics.query(Product).filter(exact_stock() < 10).all(), analytics)
     
     # Convert Product objects to dictionaries for JSON serialization
     low_stock_items_dict = []
@@ -852,6 +1043,8 @@ def report():
         'total_value': total_value
     }
     
+    reorder_suggestions = get_reorder_suggestions(limit=10, session=analytics)
+    
     # Calculate low stock statistics
     low_stock_stats = {
         'total': len(low_stock_items),
@@ -869,32 +1062,43 @@ def report():
         now=datetime.now(),
         category_stats=category_stats,
         low_stock_stats=low_stock_stats,
-        highest_value_category=highest_value_category
+        highest_value_category=highest_value_category,
+        reorder_suggestions=reorder_suggestions
     )
 
-@app.route('/reset-db')
+@bp.route('/reorder_suggestions')
+def reorder_suggestions():
+    """Forecast-driven reorder suggestions as JSON (``?limit=N``, 0 for all)."""
+    if 'user_id' not in session:
+        return jsonify({'success': False, 'message': 'Not authenticated'})
+   
+    limit = request.args.get('limit', 50, type=int)
+    suggestions = get_reorder_suggestions(limit=limit or None, session=get_analytics_session())
+    return jsonify({'success': True, 'suggestions': suggestions})
+
+@bp.route('/reset-db')
 def reset_db_route():
     """Reset the database to a clean state."""
     try:
-        init_database()
+        seed_database()
         flash('Database has been successfully reset.', 'success')
     except Exception as e:
         flash(f'Error resetting database: {e}', 'danger')
-    return redirect(url_for('dashboard'))
+    return redirect(url_for('main.dashboard'))
 
 # ------------------------- Recent Orders Page --------------------------------
 
-@app.route('/recent-orders')
+@bp.route('/recent-orders')
 def recent_orders():
     if 'user_id' not in session:
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
     
     orders_data = Order.query.order_by(Order.order_date.desc()).all()
     return render_template('recent_orders.html', orders=orders_data)
 
 # ------------------------- Add Order Page ------------------------------------
 
-@app.route('/add-order')
+@bp.route('/add-order')
 def add_order():
     return render_template('add_order.html')
 
@@ -903,10 +1107,12 @@ def add_order():
 # ------------------------------------------------------------------------------
 
 if __name__ == '__main__':
-    # Initialize database
     print("🚀 Starting Inventory Management System...")
-    init_database()
+    app = create_app()
+    with app.app_context():
+        upgrade_database()
 
     print("🌐 Access the application at: http://localhost:5000")
+    print("💡 Load demo data with: flask --app app seed-db")
     print("🔑 Demo credentials: demo@example.com / password123")
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
@@ -0,0 +1,90 @@
+import os
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event
+
+from models import db, Order, OrderItem, ArchivedOrder, ArchivedOrderItem
+
+# ------------------------------------------------------------------------------
+# Order Archive
+# ------------------------------------------------------------------------------
+# Cold storage for old delivered orders. The archive is a separate SQLite file
+# ATTACHed to every connection as schema "archive", so moves between the live
+# and archive tables are plain INSERT ... SELECT statements.
+
+def init_archive(app):
+    """Attach the archive database to every new connection of the main engine."""
+    path = app.config['ARCHIVE_DATABASE_PATH']
+    if path != ':memory:':
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def attach_archive_database(dbapi_connection, connection_record):
+        dbapi_connection.execute('ATTACH DATABASE ? AS archive', (path,))
+
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            event.listen(db.engine, 'connect', attach_archive_database)
+
+
+def archive_orders(older_than_days=None, batch_size=None):
+    """Move old delivered orders and their items into the archive database.
+
+    Orders are copied with INSERT ... SELECT and then deleted from the live
+    tables, one batch per transaction so writers are never blocked for long.
+    Returns the number of orders archived.
+    """
+    if older_than_days is None:
+        older_than_days = current_app.config['ORDER_ARCHIVE_AFTER_DAYS']
+    if batch_size is None:
+        batch_size = current_app.config['ORDER_ARCHIVE_BATCH_SIZE']
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+    orders_table = Order.__table__
+    items_table = OrderItem.__table__
+    order_columns = [c.name for c in orders_table.columns]
+    item_columns = [c.name for c in items_table.columns]
+
+    archived = 0
+    while True:
+        batch = [row[0] for row in db.session.query(Order.id).filter(
+            Order.status == 'Delivered',
+            Order.order_date < cutoff
+        ).order_by(Order.id).limit(batch_size).all()]
+        if not batch:
+            break
+
+        try:
+            db.session.execute(ArchivedOrder.__table__.insert().from_select(
+                order_columns,
+                db.select(*[orders_table.c[name] for name in order_columns]).where(orders_table.c.id.in_(batch))
+            ))
+            db.session.execute(ArchivedOrderItem.__table__.insert().from_select(
+                item_columns,
+                db.select(*[items_table.c[name] for name in item_columns]).where(items_table.c.order_id.in_(batch))
+            ))
+            db.session.execute(items_table.delete().where(items_table.c.order_id.in_(batch)))
+            db.session.execute(orders_table.delete().where(orders_table.c.id.in_(batch)))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        archived += len(batch)
+        if len(batch) < batch_size:
+            break
+
+    return archived
+
+
+@click.command('archive-orders')
+@click.option('--older-than-days', type=int, default=None,
+              help='Archive delivered orders older than this many days.')
+@click.option('--batch-size', type=int, default=None, help='Orders moved per transaction.')
+@with_appcontext
+def archive_orders_command(older_than_days, batch_size):
+    """Move old delivered orders into the archive database."""
+    archived = archive_orders(older_than_days, batch_size)
+    print(f"📦 Archived {archived} orders")
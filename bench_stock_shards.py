@@ -0,0 +1,151 @@
+"""Benchmark single-SKU create_order throughput with and without sharding.
+
+Every worker process posts orders for one unit of the same product through
+the real /create_order view (via the Flask test client), the way concurrent
+checkouts do during a flash sale: stock reservation, the order rows, the
+daily sales counter and the customer index all take part.
+
+By default the benchmark runs on a throwaway SQLite file. To measure the
+database you deploy on, point it at a scratch database and confirm that its
+benchmark tables may be dropped:
+
+    python bench_stock_shards.py --database-url postgresql://.../scratch --scratch --shards 16
+
+Only the tables the order path writes are created and dropped; the run
+refuses to start if any of them already holds data. SQLite takes one write
+lock for the whole database, so on SQLite the numbers will not scale with
+workers whether or not the product is sharded.
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from sqlalchemy import inspect
+
+from app import create_app
+from models import db, Product, ProductStockShard, Order, OrderItem, ProductSalesDaily, Customer
+from stock_shards import shard_product_stock, stock_totals
+
+BENCH_TABLES = [table.__table__ for table in (Customer, Product, ProductStockShard, Order, OrderItem,
+                                              ProductSalesDaily)]
+
+
+def make_app(database_url, workdir):
+    return create_app(config_overrides={
+        'SQLALCHEMY_DATABASE_URI': database_url,
+        'SQLALCHEMY_BINDS': {},
+        'SQLALCHEMY_ENGINE_OPTIONS': {'connect_args': {'timeout': 30}} if database_url.startswith('sqlite') else {},
+        'ARCHIVE_DATABASE_PATH': os.path.join(workdir, 'archive.db'),
+        'EVENT_LOG_PATH': os.path.join(workdir, 'events.log'),
+        'TESTING': True,
+    })
+
+
+def setup(database_url, workdir, shards, stock):
+    app = make_app(database_url, workdir)
+    with app.app_context():
+        inspector = inspect(db.engine)
+        for table in BENCH_TABLES:
+            if inspector.has_table(table.name) and db.session.query(table).first() is not None:
+                raise SystemExit(f'Table {table.name} is not empty; use an empty scratch database')
+        db.metadata.drop_all(db.engine, tables=BENCH_TABLES)
+        db.metadata.create_all(db.engine, tables=BENCH_TABLES)
+        product = Product(name='Flash Sale Item', category='Benchmark', price=9.99, quantity=stock)
+        db.session.add(product)
+        db.session.commit()
+        shard_product_stock(product.id, shards)
+        db.session.commit()
+        return product.id
+
+
+def teardown(database_url, workdir):
+    app = make_app(database_url, workdir)
+    with app.app_context():
+        db.metadata.drop_all(db.engine, tables=BENCH_TABLES)
+
+
+def worker(database_url, workdir, product_id, number, operations, results):
+    app = make_app(database_url, workdir)
+    client = app.test_client()
+    with client.session_transaction() as client_session:
+        client_session['user_id'] = 1
+    done = failed = 0
+    for i in range(operations):
+        response = client.post('/create_order', data={
+            'customer_name': f'Bench Customer {number}-{i}',
+            'customer_email': f'bench{number}-{i}@example.com',
+            'order_date': time.strftime('%Y-%m-%d'),
+            'status': 'Pending',
+            'product_id[]': [str(product_id)],
+            'quantity[]': ['1'],
+        })
+        # A created order redirects to the order list; errors re-render the form
+        if response.status_code == 302:
+            done += 1
+        else:
+            failed += 1
+    results.put((done, failed))
+
+
+def run(database_url, workdir, shards, workers, operations):
+    stock = workers * operations
+    product_id = setup(database_url, workdir, shards, stock)
+    try:
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=worker,
+                                    args=(database_url, workdir, product_id, number, operations, results))
+            for number in range(workers)
+        ]
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        totals = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+        elapsed = time.perf_counter() - start
+
+        app = make_app(database_url, workdir)
+        with app.app_context():
+            remaining = stock_totals([product_id])[product_id]
+            orders = Order.query.count()
+            units = db.session.query(db.func.coalesce(db.func.sum(ProductSalesDaily.units), 0)).filter(
+                ProductSalesDaily.product_id == product_id).scalar()
+    finally:
+        teardown(database_url, workdir)
+
+    created = sum(done for done, _ in totals)
+    # Exactness check: every created order is reflected in stock and counters
+    assert created == orders, (created, orders)
+    assert remaining == stock - created, (remaining, created)
+    assert units == created, (units, created)
+    return created / elapsed, sum(failed for _, failed in totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', default=None,
+                        help='Scratch database to benchmark (default: a temporary SQLite file)')
+    parser.add_argument('--scratch', action='store_true',
+                        help='Confirm --database-url is a scratch database whose benchmark tables may be dropped')
+    parser.add_argument('--shards', type=int, default=16)
+    parser.add_argument('--workers', default='1,2,4,8')
+    parser.add_argument('--operations', type=int, default=100, help='Orders per worker')
+    args = parser.parse_args()
+    if args.database_url and not args.scratch:
+        parser.error('--database-url drops and recreates tables; pass --scratch to confirm it is a scratch database')
+
+    workdir = tempfile.mkdtemp(prefix='bench_stock_shards_')
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    print(f"{'workers':>8} {'unsharded/s':>12} {'sharded/s':>12} {'failed':>8}")
+    for workers in (int(w) for w in args.workers.split(',')):
+        plain, plain_failed = run(database_url, workdir, 1, workers, args.operations)
+        sharded, sharded_failed = run(database_url, workdir, args.shards, workers, args.operations)
+        print(f"{workers:>8} {plain:>12.0f} {sharded:>12.0f} {plain_failed + sharded_failed:>8}")
+
+
+if __name__ == '__main__':
+    main()
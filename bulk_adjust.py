@@ -0,0 +1,171 @@
+import json
+import math
+
+from models import db, Product, ProductAdjustment
+from stock_shards import sync_sharded_totals, respread_shards, exact_stock
+from reconciliation import record_stock_adjustment
+
+# ------------------------------------------------------------------------------
+# Bulk Product Adjustments
+# ------------------------------------------------------------------------------
+# Price or stock changes across a selection of products (category, name
+# pattern and/or explicit ids). New values are computed in SQL, so applying an
+# adjustment is one UPDATE per batch of ids whatever the catalog size, and a
+# dry run is one aggregate query per batch. Every applied adjustment leaves a
+# product_adjustments audit row.
+
+ADJUSTABLE_FIELDS = ('price', 'quantity')
+ADJUSTMENT_MODES = ('percent', 'absolute')
+ADJUST_BATCH_SIZE = 1000
+PREVIEW_SAMPLE_SIZE = 20
+
+
+def _parse_product_ids(product_ids):
+    """Validate an explicit id selection: a list of integers (or digit strings)."""
+    if not isinstance(product_ids, (list, tuple)):
+        raise ValueError('Product ids must be a list')
+    ids = set()
+    for product_id in product_ids:
+        if isinstance(product_id, str) and product_id.strip().isdigit():
+            product_id = int(product_id)
+        if not isinstance(product_id, int) or isinstance(product_id, bool):
+            raise ValueError(f'Invalid product id: {product_id!r}')
+        ids.add(product_id)
+    return sorted(ids)
+
+
+def _matching_batches(category=None, name_pattern=None, product_ids=None):
+    """Yield the ids of matching products in primary-key order, at most
+    ADJUST_BATCH_SIZE at a time."""
+    filters = []
+    if category:
+        filters.append(Product.category == category)
+    if name_pattern:
+        # '*' is the wildcard; without one the pattern matches anywhere in the name
+        escaped = name_pattern.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        like = escaped.replace('*', '%') if '*' in name_pattern else f'%{escaped}%'
+        filters.append(Product.name.ilike(like, escape='\\'))
+    if not filters and product_ids is None:
+        raise ValueError('Select products by category, name pattern or product ids')
+
+    if product_ids is not None:
+        # Explicit ids: chunk the list itself so no statement gets a huge IN list
+        ids = _parse_product_ids(product_ids)
+        for start in range(0, len(ids), ADJUST_BATCH_SIZE):
+            batch = [product_id for (product_id,) in db.session.query(Product.id).filter(
+                Product.id.in_(ids[start:start + ADJUST_BATCH_SIZE]), *filters
+            ).order_by(Product.id)]
+            if batch:
+                yield batch
+        return
+
+    last_id = 0
+    while True:
+        batch = [product_id for (product_id,) in db.session.query(Product.id).filter(
+            *filters, Product.id > last_id
+        ).order_by(Product.id).limit(ADJUST_BATCH_SIZE)]
+        if not batch:
+            return
+        last_id = batch[-1]
+        yield batch
+
+
+def _new_value(field, mode, amount, column=None):
+    """SQL expression for the adjusted value of ``column`` (default: the
+    field's column); never below zero."""
+    column = getattr(Product, field) if column is None else column
+    value = column * (1 + amount / 100.0) if mode == 'percent' else column + amount
+    value = db.func.round(value, 2) if field == 'price' else db.cast(db.func.round(value), db.Integer)
+    return db.case((value < 0, 0), else_=value)
+
+
+def _validate(field, mode, amount):
+    if field not in ADJUSTABLE_FIELDS:
+        raise ValueError(f'Invalid field: {field}')
+    if mode not in ADJUSTMENT_MODES:
+        raise ValueError(f'Invalid mode: {mode}')
+    try:
+        amount = float(amount)
+    except (TypeError, ValueError):
+        raise ValueError('Amount must be a number')
+    if not math.isfinite(amount):
+        raise ValueError('Amount must be a finite number')
+    if field == 'quantity' and mode == 'absolute' and not amount.is_integer():
+        raise ValueError('Absolute stock changes must be whole units')
+    return amount
+
+
+def preview_adjustment(field, mode, amount, category=None, name_pattern=None, product_ids=None):
+    """Dry run: how many products match and what the change would do.
+
+    Stock is read as the exact shard sum for sharded products, matching the
+    sync apply_adjustment() does first. Writes nothing.
+    """
+    amount = _validate(field, mode, amount)
+    column = exact_stock() if field == 'quantity' else getattr(Product, field)
+    new_value = _new_value(field, mode, amount, column)
+
+    count = 0
+    total_before = total_after = 0
+    sample = []
+    for batch in _matching_batches(category, name_pattern, product_ids):
+        before, after = db.session.query(
+            db.func.coalesce(db.func.sum(column), 0),
+            db.func.coalesce(db.func.sum(new_value), 0)
+        ).filter(Product.id.in_(batch)).one()
+        count += len(batch)
+        total_before += before
+        total_after += after
+        if len(sample) < PREVIEW_SAMPLE_SIZE:
+            sample += db.session.query(Product.id, Product.name, column, new_value).filter(
+                Product.id.in_(batch)
+            ).order_by(Product.id).limit(PREVIEW_SAMPLE_SIZE - len(sample)).all()
+
+    return {
+        'field': field,
+        'mode': mode,
+        'amount': amount,
+        'count': count,
+        'total_before': round(float(total_before), 2),
+        'total_after': round(float(total_after), 2),
+        'sample': [{'id': product_id, 'name': name, 'before': before, 'after': after}
+                   for product_id, name, before, after in sample]
+    }
+
+
+def apply_adjustment(field, mode, amount, category=None, name_pattern=None, product_ids=None, user_id=None):
+    """Apply an adjustment in one transaction and record it.
+
+    Each batch of matching ids is changed by a single UPDATE. The caller
+    commits. Returns the audit record and the ids of the changed products.
+    """
+    amount = _validate(field, mode, amount)
+    column = getattr(Product, field)
+    new_value = _new_value(field, mode, amount)
+
+    adjustment = ProductAdjustment(
+        user_id=user_id, field=field, mode=mode, amount=amount,
+        criteria=json.dumps({'category': category, 'name_pattern': name_pattern, 'product_ids': product_ids}),
+        products_affected=0, total_before=0, total_after=0
+    )
+
+    changed_ids = []
+    for batch in _matching_batches(category, name_pattern, product_ids):
+        if field == 'quantity':
+            # Start from exact stock for sharded products
+            sync_sharded_totals(batch)
+        before = db.session.query(db.func.coalesce(db.func.sum(column), 0)).filter(Product.id.in_(batch)).scalar()
+        if field == 'quantity':
+            record_stock_adjustment(batch, new_value - Product.quantity)
+        Product.query.filter(Product.id.in_(batch)).update({field: new_value}, synchronize_session=False)
+        after = db.session.query(db.func.coalesce(db.func.sum(column), 0)).filter(Product.id.in_(batch)).scalar()
+        if field == 'quantity':
+            respread_shards(batch)
+
+        changed_ids += batch
+        adjustment.products_affected += len(batch)
+        adjustment.total_before += before
+        adjustment.total_after += after
+
+    db.session.add(adjustment)
+    return adjustment, changed_ids
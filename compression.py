@@ -0,0 +1,102 @@
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+# ------------------------------------------------------------------------------
+# Response Compression
+# ------------------------------------------------------------------------------
+# Negotiates brotli or gzip from Accept-Encoding and compresses text responses
+# after each request. Buffered responses below COMPRESS_MIN_SIZE are left
+# alone; streamed responses are compressed chunk by chunk and flushed after
+# every chunk so clients still receive data as it is produced.
+
+
+def no_compress(view):
+    """Opt a view out of response compression."""
+    view.no_compress = True
+    return view
+
+
+def _negotiate_encoding():
+    accept = request.accept_encodings
+    if brotli is not None and accept.quality('br') > 0:
+        return 'br'
+    if accept.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def _compressor(encoding, config):
+    """Return (compress, flush, finish) callables for one response body."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=config['COMPRESS_BR_LEVEL'])
+        return compressor.process, compressor.flush, compressor.finish
+    compressor = zlib.compressobj(config['COMPRESS_GZIP_LEVEL'], zlib.DEFLATED, 31)  # 31 = gzip container
+    return compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+
+
+def _compress_stream(chunks, encoding, config):
+    compress, flush, finish = _compressor(encoding, config)
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            data = compress(chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+def compress_response(response):
+    config = current_app.config
+    if not config['COMPRESS_ENABLED']:
+        return response
+
+    view = current_app.view_functions.get(request.endpoint)
+    if (request.method == 'HEAD'
+            or getattr(view, 'no_compress', False)
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.mimetype not in config['COMPRESS_MIMETYPES']
+            or 'Content-Encoding' in response.headers
+            # Byte ranges refer to the uncompressed body
+            or 'Content-Range' in response.headers):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = _negotiate_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        # File responses know their size up front; small ones aren't worth it
+        if response.content_length is not None and response.content_length < config['COMPRESS_MIN_SIZE']:
+            return response
+        response.response = _compress_stream(response.response, encoding, config)
+        response.direct_passthrough = False
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < config['COMPRESS_MIN_SIZE']:
+            return response
+        compress, _, finish = _compressor(encoding, config)
+        response.set_data(compress(data) + finish())
+
+    response.headers['Content-Encoding'] = encoding
+    # A compressed body can't serve ranges of the original
+    response.headers.pop('Accept-Ranges', None)
+    # The body differs per encoding, so a strong validator no longer matches
+    if response.headers.get('ETag', '').startswith('"'):
+        response.headers['ETag'] = 'W/' + response.headers['ETag']
+    return response
+
+
+def init_compression(app):
+    app.after_request(compress_response)
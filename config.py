@@ -0,0 +1,92 @@
+import os
+
+# ------------------------------------------------------------------------------
+# Configuration
+# ------------------------------------------------------------------------------
+# Everything deployment-specific can be overridden from the environment, so the
+# same code runs under `flask run`, gunicorn and the test suite.
+
+DEFAULT_DATABASE_URI = 'sqlite:///inventory_new.db'
+DEFAULT_ANALYTICS_URI = 'sqlite:///file:inventory_new.db?mode=ro&uri=true'
+
+
+class Config:
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'inventory-system-secret-key-2024')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URI)
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Reporting and dashboard reads go through their own read-only engine (and
+    # therefore their own connection pool) so long analytical queries never
+    # hold connections needed by the order write path. Point
+    # ANALYTICS_DATABASE_URL at a replica to move them off the primary. The
+    # read-only SQLite default only makes sense for the default database.
+    ANALYTICS_DATABASE_URL = os.environ.get(
+        'ANALYTICS_DATABASE_URL',
+        DEFAULT_ANALYTICS_URI if 'DATABASE_URL' not in os.environ else None
+    )
+    SQLALCHEMY_BINDS = {'analytics': ANALYTICS_DATABASE_URL} if ANALYTICS_DATABASE_URL else {}
+
+    # Order archive; None means <instance path>/inventory_archive.db
+    ARCHIVE_DATABASE_PATH = os.environ.get('ARCHIVE_DATABASE_PATH')
+    ORDER_ARCHIVE_AFTER_DAYS = int(os.environ.get('ORDER_ARCHIVE_AFTER_DAYS', 180))
+    ORDER_ARCHIVE_BATCH_SIZE = int(os.environ.get('ORDER_ARCHIVE_BATCH_SIZE', 500))
+
+    # Dashboard best sellers
+    PRODUCT_PERFORMANCE_WINDOW_DAYS = int(os.environ.get('PRODUCT_PERFORMANCE_WINDOW_DAYS', 30))
+    PRODUCT_PERFORMANCE_TOP_N = int(os.environ.get('PRODUCT_PERFORMANCE_TOP_N', 5))
+
+    # Demand forecasting / reorder suggestions (see forecasting.py).
+    # FORECAST_METHOD is 'ewma' (exponential smoothing) or 'moving_average'.
+    FORECAST_METHOD = os.environ.get('FORECAST_METHOD', 'ewma')
+    FORECAST_HISTORY_DAYS = int(os.environ.get('FORECAST_HISTORY_DAYS', 90))
+    FORECAST_WINDOW_DAYS = int(os.environ.get('FORECAST_WINDOW_DAYS', 28))
+    FORECAST_ALPHA = float(os.environ.get('FORECAST_ALPHA', 0.3))
+    FORECAST_LEAD_TIME_DAYS = int(os.environ.get('FORECAST_LEAD_TIME_DAYS', 7))
+    FORECAST_TARGET_COVER_DAYS = int(os.environ.get('FORECAST_TARGET_COVER_DAYS', 30))
+    FORECAST_SERVICE_Z = float(os.environ.get('FORECAST_SERVICE_Z', 1.65))  # ~95% service level
+
+    # Live dashboard/inventory updates (see events.py); None means
+    # <instance path>/events.log
+    EVENT_LOG_PATH = os.environ.get('EVENT_LOG_PATH')
+    EVENT_LOG_MAX_BYTES = int(os.environ.get('EVENT_LOG_MAX_BYTES', 5 * 1024 * 1024))
+    EVENT_STREAM_HEARTBEAT_SECONDS = int(os.environ.get('EVENT_STREAM_HEARTBEAT_SECONDS', 15))
+    # Each open stream holds a worker. Streams end after this long and the
+    # browser reconnects from its last event id, so with gunicorn's sync
+    # workers an open tab only occupies a worker part of the time; run a
+    # threaded or gevent worker class (e.g. --threads 8) for many viewers.
+    EVENT_STREAM_MAX_SECONDS = int(os.environ.get('EVENT_STREAM_MAX_SECONDS', 300))
+
+    # Opt-in SQL profiling (see query_profiler.py); None means
+    # <instance path>/sql_profile.log
+    SQL_PROFILING = os.environ.get('SQL_PROFILING', '').lower() in ('1', 'true', 'yes')
+    SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', 50))
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', 5))
+    SQL_PROFILE_LOG_PATH = os.environ.get('SQL_PROFILE_LOG_PATH')
+
+    # Response compression (see compression.py). Brotli is used when the
+    # optional `brotli` package is installed and the client accepts it.
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', '1').lower() in ('1', 'true', 'yes')
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BR_LEVEL = int(os.environ.get('COMPRESS_BR_LEVEL', 5))
+    COMPRESS_MIMETYPES = {
+        'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+        'application/javascript', 'application/json',
+    }
+
+    # Stock reconciliation (see reconciliation.py)
+    STOCK_RECONCILE_BATCH_SIZE = int(os.environ.get('STOCK_RECONCILE_BATCH_SIZE', 1000))
+
+
+class TestingConfig(Config):
+    """Isolated in-memory databases; nothing touches the instance folder."""
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_BINDS = {}
+    ARCHIVE_DATABASE_PATH = ':memory:'
+
+
+configs = {
+    'default': Config,
+    'testing': TestingConfig,
+}
@@ -0,0 +1,172 @@
+from collections import defaultdict
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import bindparam
+
+from models import db, Customer, Order, ArchivedOrder
+
+# ------------------------------------------------------------------------------
+# Customer Index
+# ------------------------------------------------------------------------------
+# Orders only carry free-text customer fields. The customers table indexes them
+# by a normalized key so "all orders for this customer" and the order-form
+# autocomplete are indexed lookups instead of case-sensitive full scans.
+
+# Upper bound for prefix range scans; sorts after any character in a key
+PREFIX_SENTINEL = '\uffff'
+
+
+def normalize_name(name):
+    return ' '.join((name or '').split()).lower()
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+def customer_key(name, email):
+    """Identity key for an order's customer: email if present, else name."""
+    email_key = normalize_email(email)
+    return email_key if email_key else f'name:{normalize_name(name)}'
+
+def attach_order_to_customer(order):
+    """Link ``order`` to its (possibly new) customer and bump the counters.
+
+    Runs in the caller's transaction; the caller commits.
+    """
+    key = customer_key(order.customer_name, order.customer_email)
+    customer = Customer.query.filter_by(key=key).first()
+    if customer is None:
+        customer = Customer(
+            key=key,
+            name=order.customer_name,
+            email=order.customer_email or None,
+            phone=order.customer_phone or None,
+            email_key=normalize_email(order.customer_email) or None,
+            name_key=normalize_name(order.customer_name),
+            order_count=1,
+            lifetime_value=order.amount or 0,
+            last_order_at=order.order_date
+        )
+        db.session.add(customer)
+        db.session.flush()
+    else:
+        # SQL-side increments so concurrent orders don't lose updates
+        customer.order_count = Customer.order_count + 1
+        customer.lifetime_value = Customer.lifetime_value + (order.amount or 0)
+        customer.name = order.customer_name
+        customer.name_key = normalize_name(order.customer_name)
+        if order.customer_phone:
+            customer.phone = order.customer_phone
+        if customer.last_order_at is None or order.order_date > customer.last_order_at:
+            customer.last_order_at = order.order_date
+    order.customer_id = customer.id
+    return customer
+
+def detach_order_from_customer(order, amount=None):
+    """Remove ``order`` (counted at ``amount``, default its current amount)
+    from its customer's counters."""
+    if order.customer_id is None:
+        return
+    amount = order.amount if amount is None else amount
+    Customer.query.filter_by(id=order.customer_id).update({
+        'order_count': Customer.order_count - 1,
+        'lifetime_value': Customer.lifetime_value - (amount or 0)
+    }, synchronize_session=False)
+
+def sync_order_customer(order, previous_amount):
+    """Re-index an edited order whose customer fields or amount may have changed."""
+    key = customer_key(order.customer_name, order.customer_email)
+    customer = order.customer
+    if customer is not None and customer.key == key:
+        customer.lifetime_value = Customer.lifetime_value + ((order.amount or 0) - (previous_amount or 0))
+        customer.name = order.customer_name
+        customer.name_key = normalize_name(order.customer_name)
+        if order.customer_phone:
+            customer.phone = order.customer_phone
+        return customer
+    detach_order_from_customer(order, previous_amount)
+    return attach_order_to_customer(order)
+
+def search_customers(prefix, limit=10, session=None):
+    """Customers whose email or name starts with ``prefix`` (case-insensitive),
+    most active first. Both lookups are index range scans."""
+    session = session or db.session
+    prefix = normalize_name(prefix)
+    if not prefix:
+        return []
+
+    matches = {}
+    for column in (Customer.email_key, Customer.name_key):
+        for customer in session.query(Customer).filter(
+            column >= prefix,
+            column < prefix + PREFIX_SENTINEL
+        ).order_by(column).limit(limit).all():
+            matches[customer.id] = customer
+
+    return sorted(matches.values(), key=lambda c: (-c.order_count, c.name_key))[:limit]
+
+def get_customer_orders(customer_id, session=None):
+    """All live and archived orders for a customer, newest first."""
+    session = session or db.session
+    orders = session.query(Order).filter(Order.customer_id == customer_id).all()
+    orders += session.query(ArchivedOrder).filter(ArchivedOrder.customer_id == customer_id).all()
+    return sorted(orders, key=lambda o: o.order_date, reverse=True)
+
+def rebuild_customer_index():
+    """Rebuild the customers table and every order's customer_id from scratch.
+
+    Returns the number of customers indexed.
+    """
+    customers = {}
+    stats = defaultdict(lambda: [0, 0.0, None])
+    for model in (Order, ArchivedOrder):
+        for order in db.session.query(
+            model.id, model.customer_name, model.customer_email, model.customer_phone,
+            model.amount, model.order_date
+        ).order_by(model.order_date).yield_per(1000):
+            key = customer_key(order.customer_name, order.customer_email)
+            # Latest order wins for display name / phone
+            customers[key] = (order.customer_name, order.customer_email, order.customer_phone)
+            stats[key][0] += 1
+            stats[key][1] += order.amount or 0
+            stats[key][2] = max(filter(None, (stats[key][2], order.order_date)))
+
+    Order.query.update({'customer_id': None}, synchronize_session=False)
+    ArchivedOrder.query.update({'customer_id': None}, synchronize_session=False)
+    Customer.query.delete()
+
+    new_customers = []
+    for key, (name, email, phone) in customers.items():
+        order_count, lifetime_value, last_order_at = stats[key]
+        new_customers.append(Customer(
+            key=key, name=name, email=email or None, phone=phone or None,
+            email_key=normalize_email(email) or None, name_key=normalize_name(name),
+            order_count=order_count, lifetime_value=lifetime_value, last_order_at=last_order_at
+        ))
+    db.session.add_all(new_customers)
+    db.session.flush()
+    key_to_id = {customer.key: customer.id for customer in new_customers}
+
+    for model in (Order, ArchivedOrder):
+        updates = [
+            {'order_pk': order_pk, 'new_customer_id': key_to_id[customer_key(name, email)]}
+            for order_pk, name, email in db.session.query(model.id, model.customer_name, model.customer_email)
+        ]
+        if updates:
+            table = model.__table__
+            db.session.execute(
+                table.update().where(table.c.id == bindparam('order_pk'))
+                .values(customer_id=bindparam('new_customer_id')),
+                updates
+            )
+
+    db.session.commit()
+    return len(key_to_id)
+
+
+@click.command('rebuild-customer-index')
+@with_appcontext
+def rebuild_customer_index_command():
+    """Rebuild the customer index from all live and archived orders."""
+    count = rebuild_customer_index()
+    print(f"👥 Indexed {count} customers")
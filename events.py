@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import time
+
+from flask import current_app
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+# ------------------------------------------------------------------------------
+# Live Update Events
+# ------------------------------------------------------------------------------
+# Write paths publish small deltas (stock changes, new orders, status changes,
+# revenue) after they commit. Events are appended as JSON lines to a shared
+# file so every worker process on the host sees them; a stream follows the file
+# from a byte offset, which doubles as the SSE event id for reconnects.
+
+
+class EventChannel:
+    """File-backed broadcast channel shared by all workers on one host."""
+
+    def __init__(self, path, max_bytes=5 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._condition = threading.Condition()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    def publish(self, event_type, data):
+        line = json.dumps({'type': event_type, 'data': data, 'ts': time.time()}, default=str) + '\n'
+        with self._lock, open(self.path, 'a+', encoding='utf-8') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                # Start over once the log gets big; followers notice the file
+                # shrinking and rewind.
+                f.seek(0, os.SEEK_END)
+                if f.tell() > self.max_bytes:
+                    f.truncate(0)
+                f.write(line)
+                f.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        # Wake streams in this process immediately; other processes poll.
+        with self._condition:
+            self._condition.notify_all()
+
+    def current_offset(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def follow(self, offset=None, poll_interval=0.5, heartbeat=15):
+        """Yield ``(offset, event)`` for every event after ``offset``.
+
+        Yields ``(offset, None)`` as a heartbeat when nothing arrived for
+        ``heartbeat`` seconds. Never touches the database.
+        """
+        if offset is None:
+            offset = self.current_offset()
+        last_sent = time.monotonic()
+        while True:
+            size = self.current_offset()
+            if size < offset:
+                offset = 0
+            if size > offset:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    f.seek(offset)
+                    for line in f:
+                        if not line.endswith('\n'):
+                            break  # partially written; pick it up next time
+                        offset += len(line.encode('utf-8'))
+                        try:
+                            event = json.loads(line)
+                        except ValueError:
+                            continue
+                        last_sent = time.monotonic()
+                        yield offset, event
+            if time.monotonic() - last_sent >= heartbeat:
+                last_sent = time.monotonic()
+                yield offset, None
+            with self._condition:
+                self._condition.wait(poll_interval)
+
+
+def init_events(app):
+    path = app.config.get('EVENT_LOG_PATH') or os.path.join(app.instance_path, 'events.log')
+    app.extensions['event_channel'] = EventChannel(path, app.config.get('EVENT_LOG_MAX_BYTES', 5 * 1024 * 1024))
+
+
+def publish_event(event_type, data):
+    """Publish a live-update event. Must be called after the change commits."""
+    channel = current_app.extensions.get('event_channel')
+    if channel is None:
+        return
+    try:
+        channel.publish(event_type, data)
+    except OSError as e:
+        # Live updates are best-effort; never fail the write that triggered them
+        print(f"Error publishing {event_type} event: {e}")
@@ -0,0 +1,184 @@
+import csv
+import threading
+from datetime import date, timedelta
+
+import click
+import numpy as np
+from flask import current_app
+from flask.cli import with_appcontext
+
+from models import db, Product, ProductSalesDaily
+from stock_shards import exact_stock
+
+# ------------------------------------------------------------------------------
+# Demand Forecasting
+# ------------------------------------------------------------------------------
+# Daily demand comes from the product_sales_daily counters (which already fold
+# in OrderItem and Sale rows), so the whole catalog loads with two queries and
+# every statistic below is a single NumPy operation across all products.
+
+_forecast_cache = {'key': None, 'result': None}
+_forecast_lock = threading.Lock()
+
+
+def _load_daily_demand(session, start, days):
+    """Return (product_ids, stock, demand) with demand shaped (products, days)."""
+    products = session.query(Product.id, exact_stock()).order_by(Product.id).all()
+    product_ids = np.fromiter((row[0] for row in products), dtype=np.int64, count=len(products))
+    stock = np.fromiter((row[1] for row in products), dtype=np.float64, count=len(products))
+
+    demand = np.zeros((len(products), days), dtype=np.float32)
+    counters = session.query(
+        ProductSalesDaily.product_id, ProductSalesDaily.day, ProductSalesDaily.units
+    ).filter(ProductSalesDaily.day >= start).all()
+    if counters and len(products):
+        counter_products = np.fromiter((row[0] for row in counters), dtype=np.int64, count=len(counters))
+        counter_days = np.array([row[1] for row in counters], dtype='datetime64[D]')
+        units = np.fromiter((row[2] for row in counters), dtype=np.float32, count=len(counters))
+
+        rows = np.searchsorted(product_ids, counter_products)
+        rows = np.clip(rows, 0, len(product_ids) - 1)
+        cols = (counter_days - np.datetime64(start, 'D')).astype(np.int64)
+        # Drop counters for deleted products and any future-dated orders
+        valid = (product_ids[rows] == counter_products) & (cols >= 0) & (cols < days)
+        np.add.at(demand, (rows[valid], cols[valid]), units[valid])
+
+    return product_ids, stock, demand
+
+
+def _smooth_demand(demand, method, window, alpha):
+    """Per-product daily demand estimate and its standard deviation."""
+    if demand.shape[1] == 0:
+        zeros = np.zeros(demand.shape[0])
+        return zeros, zeros
+
+    if method == 'moving_average':
+        recent = demand[:, -window:]
+        return recent.mean(axis=1, dtype=np.float64), recent.std(axis=1, dtype=np.float64)
+
+    # Simple exponential smoothing: one vector update per day of history
+    level = demand[:, 0].astype(np.float64)
+    variance = np.zeros(demand.shape[0])
+    for day in range(1, demand.shape[1]):
+        error = demand[:, day] - level
+        level += alpha * error
+        variance = (1 - alpha) * (variance + alpha * error * error)
+    return level, np.sqrt(variance)
+
+
+def compute_reorder_plan(session=None, today=None):
+    """Forecast demand and reorder quantities for the whole catalog.
+
+    Returns a dict of NumPy arrays aligned by product: ``product_ids``,
+    ``stock``, ``daily_demand``, ``days_of_cover`` (inf when there is no
+    demand) and ``reorder_quantity``.
+    """
+    session = session or db.session
+    config = current_app.config
+    today = today or date.today()
+    history_days = config['FORECAST_HISTORY_DAYS']
+    start = today - timedelta(days=history_days - 1)
+
+    product_ids, stock, demand = _load_daily_demand(session, start, history_days)
+    daily_demand, demand_std = _smooth_demand(
+        demand, config['FORECAST_METHOD'], config['FORECAST_WINDOW_DAYS'], config['FORECAST_ALPHA']
+    )
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days_of_cover = np.where(daily_demand > 0, stock / daily_demand, np.inf)
+
+    # Reorder once stock falls to the lead-time demand plus safety stock, and
+    # order enough to cover the lead time plus the target cover period.
+    lead_time = config['FORECAST_LEAD_TIME_DAYS']
+    safety_stock = config['FORECAST_SERVICE_Z'] * demand_std * np.sqrt(lead_time)
+    reorder_point = daily_demand * lead_time + safety_stock
+    target_stock = daily_demand * (lead_time + config['FORECAST_TARGET_COVER_DAYS']) + safety_stock
+    reorder_quantity = np.where(
+        (daily_demand > 0) & (stock <= reorder_point),
+        np.ceil(np.maximum(target_stock - stock, 0)),
+        0
+    ).astype(np.int64)
+
+    return {
+        'product_ids': product_ids,
+        'stock': stock,
+        'daily_demand': daily_demand,
+        'days_of_cover': days_of_cover,
+        'reorder_quantity': reorder_quantity,
+    }
+
+
+def _forecast_cache_key(session, today):
+    """Cheap fingerprint that changes whenever sales or stock levels change.
+
+    Both MAX(updated_at) lookups are answered from their indexes; the counts
+    catch deleted products (and with them their counters).
+    """
+    counters = session.query(db.func.max(ProductSalesDaily.updated_at)).scalar()
+    products = session.query(db.func.count(Product.id), db.func.max(Product.updated_at)).one()
+    return (today, counters, tuple(products))
+
+
+def get_reorder_plan(session=None):
+    """compute_reorder_plan(), cached until new sales or stock changes arrive."""
+    session = session or db.session
+    today = date.today()
+    key = _forecast_cache_key(session, today)
+    with _forecast_lock:
+        if _forecast_cache['key'] == key:
+            return _forecast_cache['result']
+    result = compute_reorder_plan(session, today)
+    with _forecast_lock:
+        _forecast_cache['key'] = key
+        _forecast_cache['result'] = result
+    return result
+
+
+def get_reorder_suggestions(limit=20, session=None):
+    """Products that need reordering, most urgent (lowest cover) first."""
+    session = session or db.session
+    plan = get_reorder_plan(session)
+    needs_reorder = np.flatnonzero(plan['reorder_quantity'] > 0)
+    order = needs_reorder[np.argsort(plan['days_of_cover'][needs_reorder], kind='stable')]
+    if limit is not None:
+        order = order[:limit]
+
+    names = {}
+    selected_ids = plan['product_ids'][order].tolist()
+    for start in range(0, len(selected_ids), 500):
+        names.update(session.query(Product.id, Product.name).filter(
+            Product.id.in_(selected_ids[start:start + 500])
+        ).all())
+
+    return [{
+        'product_id': int(plan['product_ids'][i]),
+        'name': names.get(int(plan['product_ids'][i]), ''),
+        'stock': int(plan['stock'][i]),
+        'daily_demand': round(float(plan['daily_demand'][i]), 2),
+        'days_of_cover': round(float(plan['days_of_cover'][i]), 1),
+        'reorder_quantity': int(plan['reorder_quantity'][i]),
+    } for i in order]
+
+
+@click.command('forecast-demand')
+@click.option('--output', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Write the full reorder plan to this CSV file.')
+@with_appcontext
+def forecast_demand_command(output):
+    """Compute demand forecasts and reorder quantities for every product."""
+    plan = compute_reorder_plan()
+    to_reorder = int((plan['reorder_quantity'] > 0).sum())
+    print(f"📈 Forecast {len(plan['product_ids'])} products, {to_reorder} need reordering")
+
+    if output:
+        with open(output, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['product_id', 'stock', 'daily_demand', 'days_of_cover', 'reorder_quantity'])
+            writer.writerows(zip(
+                plan['product_ids'].tolist(),
+                plan['stock'].astype(np.int64).tolist(),
+                np.round(plan['daily_demand'], 3).tolist(),
+                np.round(plan['days_of_cover'], 1).tolist(),
+                plan['reorder_quantity'].tolist(),
+            ))
+        print(f"💾 Reorder plan written to {output}")
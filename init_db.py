@@ -1,13 +1,9 @@
-import os
-from app import app, db
+from app import create_app
+from seed import upgrade_database
 
-# Remove existing database
-if os.path.exists('inventory.db'):
-    os.remove('inventory.db')
-    print("Removed old database")
-
-# Create new database with tables
+# Create missing tables and upgrade older databases in place. Use
+# `flask --app app seed-db` to load demo data.
+app = create_app()
 with app.app_context():
-    db.create_all()
-    print("Created new database with all tables")
-    print("Database schema should now include user.name column")
\ No newline at end of file
+    upgrade_database()
+    print("Database schema is up to date")
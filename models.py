@@ -0,0 +1,258 @@
+from datetime import datetime
+from flask_sqlalchemy import SQLAlchemy
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Created unbound; create_app() calls db.init_app(app).
+db = SQLAlchemy()
+
+# ------------------------------------------------------------------------------
+# Models
+# ------------------------------------------------------------------------------
+
+class User(db.Model):
+    __tablename__ = 'users'
+   
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(100), unique=True, nullable=False)
+    password = db.Column(db.String(200), nullable=False)
+    image_url = db.Column(db.String(200), default=None)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def set_password(self, password):
+        self.password = generate_password_hash(password)
+
+    def check_password(self, password):
+        return check_password_hash(self.password, password)
+
+
+class Product(db.Model):
+    __tablename__ = 'products'
+   
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    price = db.Column(db.Float, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    description = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+
+class Customer(db.Model):
+    """Normalized customer index built from the free-text fields on orders.
+
+    ``key`` is the lowercased email, or ``name:<normalized name>`` for orders
+    without one. ``email_key`` and ``name_key`` are lowercased copies used for
+    indexed prefix search. Counters are maintained by customers.py.
+    """
+    __tablename__ = 'customers'
+   
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(120), unique=True, nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(100))
+    phone = db.Column(db.String(20))
+    email_key = db.Column(db.String(100), index=True)
+    name_key = db.Column(db.String(100), nullable=False, index=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    lifetime_value = db.Column(db.Float, nullable=False, default=0)
+    last_order_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class OrderItem(db.Model):
+    __tablename__ = 'order_items'
+    # AUTOINCREMENT so ids of archived rows are never handed out again
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('orders.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    unit_price = db.Column(db.Float, nullable=False)
+    
+    product = db.relationship('Product', backref='order_items')
+
+
+class Order(db.Model):
+    __tablename__ = 'orders'
+    __table_args__ = {'sqlite_autoincrement': True}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.String(20), unique=True, nullable=False)
+    customer_name = db.Column(db.String(100), nullable=False)
+    customer_email = db.Column(db.String(100))
+    customer_phone = db.Column(db.String(20))
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), index=True)
+    order_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    amount = db.Column(db.Float, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='Pending')
+    tracking_number = db.Column(db.String(50))
+    shipping_address = db.Column(db.Text)
+    notes = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    items = db.relationship('OrderItem', backref='order', cascade='all, delete-orphan')
+    customer = db.relationship('Customer')
+    
+    is_archived = False
+
+
+class ArchivedOrderItem(db.Model):
+    __tablename__ = 'order_items'
+    __table_args__ = {'schema': 'archive'}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('archive.orders.id'), nullable=False, index=True)
+    # Products live in the main database, so there is no enforceable FK here
+    product_id = db.Column(db.Integer, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False)
+    unit_price = db.Column(db.Float, nullable=False)
+    
+    product = db.relationship('Product', primaryjoin='foreign(ArchivedOrderItem.product_id) == Product.id',
+                              viewonly=True)
+
+
+class ArchivedOrder(db.Model):
+    """Read-only copy of an order moved out of the live tables by archive_orders()."""
+    __tablename__ = 'orders'
+    __table_args__ = {'schema': 'archive'}
+    
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.String(20), unique=True, nullable=False)
+    customer_name = db.Column(db.String(100), nullable=False)
+    customer_email = db.Column(db.String(100))
+    customer_phone = db.Column(db.String(20))
+    # Customers live in the main database, so there is no enforceable FK here
+    customer_id = db.Column(db.Integer, index=True)
+    order_date = db.Column(db.DateTime, nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    tracking_number = db.Column(db.String(50))
+    shipping_address = db.Column(db.Text)
+    notes = db.Column(db.Text)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    items = db.relationship('ArchivedOrderItem', backref='order', viewonly=True)
+    
+    is_archived = True
+
+
+class Sale(db.Model):
+    __tablename__ = 'sales'
+   
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    quantity_sold = db.Column(db.Integer, nullable=False)
+    sale_price = db.Column(db.Float, nullable=False)
+    sale_date = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    product = db.relationship('Product', backref='sales')
+
+
+class ProductSalesDaily(db.Model):
+    """Per-product, per-day sales counters.
+
+    Maintained incrementally by the order write paths (see product_stats.py)
+    so top-product queries only scan the days in their window instead of the
+    whole order and sales history. Products with sharded stock spread their
+    counter over the same number of rows per day (``shard``); readers always
+    SUM over a product's rows.
+    """
+    __tablename__ = 'product_sales_daily'
+    __table_args__ = (db.UniqueConstraint('product_id', 'day', 'shard'),)
+   
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    day = db.Column(db.Date, nullable=False, index=True)
+    shard = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    units = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0)
+    # Lets stock reconciliation find products with new sales since its last run
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+
+class ProductSearchToken(db.Model):
+    """One row per word in a product's name or category.
+
+    Lets the order-form typeahead answer prefix queries with index range scans
+    instead of loading the catalog. Maintained by product_search.py.
+    """
+    __tablename__ = 'product_search_tokens'
+    __table_args__ = (db.Index('ix_product_search_tokens_token_product', 'token', 'product_id'),)
+   
+    id = db.Column(db.Integer, primary_key=True)
+    token = db.Column(db.String(100), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False, index=True)
+
+
+class ProductStockShard(db.Model):
+    """One slice of a hot product's stock.
+
+    Products with shard rows take reservations against a shard instead of the
+    products row, so concurrent orders for the same SKU update different rows.
+    The product's exact stock is the sum of its shards; see stock_shards.py.
+    """
+    __tablename__ = 'product_stock_shards'
+    __table_args__ = (db.UniqueConstraint('product_id', 'shard'),)
+   
+    id = db.Column(db.Integer, primary_key=True)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False, index=True)
+    shard = db.Column(db.Integer, nullable=False)
+    quantity = db.Column(db.Integer, nullable=False, default=0)
+
+
+class ProductAdjustment(db.Model):
+    """Audit record of one bulk price/stock adjustment (see bulk_adjust.py)."""
+    __tablename__ = 'product_adjustments'
+   
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'))
+    field = db.Column(db.String(20), nullable=False)  # price / quantity
+    mode = db.Column(db.String(20), nullable=False)  # percent / absolute
+    amount = db.Column(db.Float, nullable=False)
+    criteria = db.Column(db.Text, nullable=False)  # JSON of the product selection
+    products_affected = db.Column(db.Integer, nullable=False, default=0)
+    total_before = db.Column(db.Float)
+    total_after = db.Column(db.Float)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class StockCheckpoint(db.Model):
+    """Per-product stock and cumulative units sold as of the last reconciliation.
+
+    Expected stock is ``quantity - (units sold now - units_sold)``; see
+    reconciliation.py.
+    """
+    __tablename__ = 'stock_checkpoints'
+   
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), primary_key=True)
+    quantity = db.Column(db.Integer, nullable=False)
+    units_sold = db.Column(db.Integer, nullable=False, default=0)
+    checked_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class StockReconciliationRun(db.Model):
+    __tablename__ = 'stock_reconciliation_runs'
+   
+    id = db.Column(db.Integer, primary_key=True)
+    started_at = db.Column(db.DateTime, nullable=False, index=True)
+    finished_at = db.Column(db.DateTime)
+    products_checked = db.Column(db.Integer, nullable=False, default=0)
+    discrepancies = db.Column(db.Integer, nullable=False, default=0)
+    corrected = db.Column(db.Boolean, nullable=False, default=False)
+
+
+class StockDiscrepancy(db.Model):
+    __tablename__ = 'stock_discrepancies'
+   
+    id = db.Column(db.Integer, primary_key=True)
+    run_id = db.Column(db.Integer, db.ForeignKey('stock_reconciliation_runs.id'), nullable=False, index=True)
+    product_id = db.Column(db.Integer, nullable=False, index=True)
+    expected_quantity = db.Column(db.Integer, nullable=False)
+    actual_quantity = db.Column(db.Integer, nullable=False)
+    corrected = db.Column(db.Boolean, nullable=False, default=False)
@@ -0,0 +1,78 @@
+import re
+
+import click
+from flask.cli import with_appcontext
+
+from models import db, Product, ProductSearchToken
+from stock_shards import exact_stock
+
+# ------------------------------------------------------------------------------
+# Product Typeahead
+# ------------------------------------------------------------------------------
+# Every word of a product's name and category is stored as a token. A query
+# matches products that have, for each query word, some token starting with
+# that word, so "mac pro" finds 'MacBook Pro 16"'. Each word is one index range
+# scan on product_search_tokens, independent of catalog size.
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+# Upper bound for prefix range scans; sorts after any character in a token
+PREFIX_SENTINEL = '\uffff'
+
+
+def tokenize(text):
+    return sorted(set(TOKEN_PATTERN.findall((text or '').lower())))
+
+def _product_tokens(product_id, name, category):
+    return [{'token': token, 'product_id': product_id} for token in tokenize(f'{name} {category}')]
+
+def index_product(product):
+    """(Re)index one product's name and category. The caller commits."""
+    ProductSearchToken.query.filter_by(product_id=product.id).delete(synchronize_session=False)
+    rows = _product_tokens(product.id, product.name, product.category)
+    if rows:
+        db.session.execute(ProductSearchToken.__table__.insert(), rows)
+
+def unindex_product(product_id):
+    ProductSearchToken.query.filter_by(product_id=product_id).delete(synchronize_session=False)
+
+def search_products(query, limit=10, session=None):
+    """Top products matching every word of ``query`` as a prefix.
+
+    In-stock products come first, then alphabetical order.
+    """
+    session = session or db.session
+    words = TOKEN_PATTERN.findall((query or '').lower())
+    if not words:
+        return []
+
+    product_query = session.query(Product)
+    for word in set(words):
+        matching = session.query(ProductSearchToken.product_id).filter(
+            ProductSearchToken.token >= word,
+            ProductSearchToken.token < word + PREFIX_SENTINEL
+        )
+        product_query = product_query.filter(Product.id.in_(matching))
+
+    return product_query.order_by(
+        (exact_stock() > 0).desc(),
+        Product.name
+    ).limit(limit).all()
+
+def rebuild_product_search_index():
+    """Rebuild the token index for the whole catalog. Returns tokens written."""
+    ProductSearchToken.query.delete()
+    rows = []
+    for product_id, name, category in db.session.query(Product.id, Product.name, Product.category).yield_per(1000):
+        rows.extend(_product_tokens(product_id, name, category))
+    if rows:
+        db.session.execute(ProductSearchToken.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+
+@click.command('rebuild-product-search')
+@with_appcontext
+def rebuild_product_search_command():
+    """Rebuild the product typeahead index."""
+    count = rebuild_product_search_index()
+    print(f"🔎 Indexed {count} product search tokens")
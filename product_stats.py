@@ -0,0 +1,152 @@
+import random
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, Product, Order, OrderItem, ArchivedOrder, ArchivedOrderItem, Sale, ProductSalesDaily
+from stock_shards import shard_counts
+
+# ------------------------------------------------------------------------------
+# Product Performance
+# ------------------------------------------------------------------------------
+
+def record_product_sales(day, entries, sign=1):
+    """Add (or with ``sign=-1`` remove) sales to the daily product counters.
+
+    ``entries`` is an iterable of ``(product_id, quantity, unit_price)``.
+    Hot products with sharded stock write to a random one of their counter
+    shards so concurrent orders don't queue on one row.
+    Runs in the caller's transaction; the caller commits.
+    """
+    totals = defaultdict(lambda: [0, 0.0])
+    for product_id, quantity, unit_price in entries:
+        totals[product_id][0] += sign * quantity
+        totals[product_id][1] += sign * quantity * unit_price
+    shards = shard_counts(totals)
+
+    table = ProductSalesDaily.__table__
+    dialect = db.session.get_bind().dialect.name
+    insert = {'sqlite': sqlite_insert, 'postgresql': postgresql_insert}.get(dialect)
+    for product_id, (units, revenue) in totals.items():
+        shard = random.randrange(shards[product_id]) if product_id in shards else 0
+        if insert is not None:
+            stmt = insert(table).values(product_id=product_id, day=day, shard=shard, units=units, revenue=revenue)
+            db.session.execute(stmt.on_conflict_do_update(
+                index_elements=['product_id', 'day', 'shard'],
+                set_={'units': table.c.units + stmt.excluded.units,
+                      'revenue': table.c.revenue + stmt.excluded.revenue,
+                      'updated_at': datetime.utcnow()}
+            ))
+        else:
+            result = db.session.execute(table.update().where(
+                table.c.product_id == product_id,
+                table.c.day == day,
+                table.c.shard == shard
+            ).values(units=table.c.units + units, revenue=table.c.revenue + revenue))
+            if result.rowcount == 0:
+                db.session.execute(table.insert().values(
+                    product_id=product_id, day=day, shard=shard, units=units, revenue=revenue))
+
+def record_order_sales(order, sign=1):
+    """Add or remove every item of ``order`` from the daily product counters."""
+    record_product_sales(
+        order.order_date.date(),
+        [(item.product_id, item.quantity, item.unit_price) for item in order.items],
+        sign
+    )
+
+def move_order_sales(order, previous_date):
+    """Shift an order's counters to its new order_date after an edit."""
+    if previous_date.date() == order.order_date.date():
+        return
+    entries = [(item.product_id, item.quantity, item.unit_price) for item in order.items]
+    record_product_sales(previous_date.date(), entries, sign=-1)
+    record_product_sales(order.order_date.date(), entries)
+
+def rebuild_product_sales():
+    """Recompute all daily product counters from order items and sales.
+
+    Archived orders are included so counters survive order archival.
+    Returns the number of counter rows written.
+    """
+    order_day = db.func.date(Order.order_date)
+    archived_day = db.func.date(ArchivedOrder.order_date)
+    sale_day = db.func.date(Sale.sale_date)
+    sources = [
+        db.session.query(
+            OrderItem.product_id, order_day,
+            db.func.sum(OrderItem.quantity), db.func.sum(OrderItem.quantity * OrderItem.unit_price)
+        ).join(Order, Order.id == OrderItem.order_id).group_by(OrderItem.product_id, order_day),
+        db.session.query(
+            ArchivedOrderItem.product_id, archived_day,
+            db.func.sum(ArchivedOrderItem.quantity),
+            db.func.sum(ArchivedOrderItem.quantity * ArchivedOrderItem.unit_price)
+        ).join(ArchivedOrder, ArchivedOrder.id == ArchivedOrderItem.order_id).group_by(
+            ArchivedOrderItem.product_id, archived_day),
+        db.session.query(
+            Sale.product_id, sale_day,
+            db.func.sum(Sale.quantity_sold), db.func.sum(Sale.quantity_sold * Sale.sale_price)
+        ).group_by(Sale.product_id, sale_day),
+    ]
+
+    totals = defaultdict(lambda: [0, 0.0])
+    for query in sources:
+        for product_id, day, units, revenue in query:
+            key = (product_id, date.fromisoformat(str(day)[:10]))
+            totals[key][0] += units or 0
+            totals[key][1] += revenue or 0
+
+    ProductSalesDaily.query.delete()
+    rows = [{'product_id': product_id, 'day': day, 'units': units, 'revenue': revenue}
+            for (product_id, day), (units, revenue) in totals.items()]
+    if rows:
+        db.session.execute(ProductSalesDaily.__table__.insert(), rows)
+    db.session.commit()
+    return len(rows)
+
+def get_top_products(limit=5, days=30, by='revenue', session=None):
+    """Return the best-selling products over the last ``days`` days.
+
+    ``by`` is ``'revenue'`` or ``'units'``; ``days=None`` means all time.
+    Each entry carries its share of the window total as ``percentage``.
+    """
+    session = session or db.session
+    units = db.func.sum(ProductSalesDaily.units)
+    revenue = db.func.sum(ProductSalesDaily.revenue)
+    metric = revenue if by == 'revenue' else units
+
+    query = session.query(Product.id, Product.name, units, revenue).join(
+        Product, Product.id == ProductSalesDaily.product_id
+    )
+    total_query = session.query(db.func.coalesce(metric, 0))
+    if days is not None:
+        cutoff = date.today() - timedelta(days=days - 1)
+        query = query.filter(ProductSalesDaily.day >= cutoff)
+        total_query = total_query.filter(ProductSalesDaily.day >= cutoff)
+
+    rows = query.group_by(Product.id, Product.name).having(metric > 0).order_by(metric.desc()).limit(limit).all()
+    total = total_query.scalar() or 0
+
+    top_products = []
+    for product_id, name, product_units, product_revenue in rows:
+        value = product_revenue if by == 'revenue' else product_units
+        top_products.append({
+            'product_id': product_id,
+            'name': name,
+            'units': int(product_units or 0),
+            'revenue': float(product_revenue or 0),
+            'percentage': int(round(value / total * 100)) if total > 0 else 0
+        })
+    return top_products
+
+
+@click.command('rebuild-product-stats')
+@with_appcontext
+def rebuild_product_stats_command():
+    """Recompute the daily product sales counters from scratch."""
+    rows = rebuild_product_sales()
+    print(f"📈 Rebuilt {rows} product sales counters")
@@ -0,0 +1,112 @@
+import logging
+import os
+import re
+import time
+from collections import Counter
+
+from flask import g, request, has_request_context
+from sqlalchemy import event
+
+from models import db
+
+# ------------------------------------------------------------------------------
+# SQL Profiling
+# ------------------------------------------------------------------------------
+# Opt-in (SQL_PROFILING=1). Hooks every engine's cursor events, logs statements
+# slower than SQL_SLOW_QUERY_MS together with their parameter shapes, the route
+# that issued them and SQLite's EXPLAIN QUERY PLAN, and at the end of each
+# request warns about statement shapes repeated often enough to look like N+1
+# query loops.
+
+logger = logging.getLogger('inventory.sql')
+
+_WHITESPACE = re.compile(r'\s+')
+_PLACEHOLDER_LIST = re.compile(r'\?(?:\s*,\s*\?)+')
+
+
+def statement_shape(statement):
+    """Normalize a statement so repeats with different IN-list sizes match."""
+    return _PLACEHOLDER_LIST.sub('?, ...', _WHITESPACE.sub(' ', statement).strip())
+
+
+def parameter_shape(parameters, executemany=False):
+    """Describe bound parameters by type only; values never reach the log."""
+    if executemany:
+        rows = list(parameters or [])
+        return f'{len(rows)} x {parameter_shape(rows[0]) if rows else "()"}'
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f'{key}: {type(value).__name__}' for key, value in parameters.items()) + '}'
+    return '(' + ', '.join(type(value).__name__ for value in (parameters or ())) + ')'
+
+
+def _current_route():
+    if not has_request_context():
+        return '<no request>'
+    return f'{request.method} {request.endpoint or request.path}'
+
+
+def _explain(conn, statement, parameters):
+    """EXPLAIN QUERY PLAN for a SQLite statement, one plan step per line."""
+    try:
+        cursor = conn.connection.cursor()
+        try:
+            rows = cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters or ()).fetchall()
+        finally:
+            cursor.close()
+    except Exception as e:
+        return f'<plan unavailable: {e}>'
+    return '\n'.join(f'    {row[-1]}' for row in rows)
+
+
+def init_query_profiler(app):
+    """Attach the slow-query log and N+1 detector when SQL_PROFILING is on."""
+    if not app.config.get('SQL_PROFILING'):
+        return
+
+    slow_seconds = app.config['SQL_SLOW_QUERY_MS'] / 1000.0
+    repeat_threshold = app.config['SQL_N_PLUS_ONE_THRESHOLD']
+
+    log_path = app.config.get('SQL_PROFILE_LOG_PATH') or os.path.join(app.instance_path, 'sql_profile.log')
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    # The logger is process-wide; apps sharing a log file share one handler
+    if not any(getattr(handler, 'baseFilename', None) == os.path.abspath(log_path) for handler in logger.handlers):
+        handler = logging.FileHandler(log_path)
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+        logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+        shape = statement_shape(statement)
+
+        if has_request_context():
+            if 'sql_shapes' not in g:
+                g.sql_shapes = Counter()
+            g.sql_shapes[shape] += 1
+
+        if elapsed < slow_seconds:
+            return
+        message = (f'Slow query ({elapsed * 1000:.1f} ms) in {_current_route()}\n'
+                   f'  {shape}\n'
+                   f'  params: {parameter_shape(parameters, executemany)}')
+        if conn.dialect.name == 'sqlite' and not executemany:
+            message += '\n  plan:\n' + _explain(conn, statement, parameters)
+        logger.warning(message)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+    @app.teardown_request
+    def report_repeated_statements(exception=None):
+        shapes = g.pop('sql_shapes', None)
+        if not shapes:
+            return
+        for shape, count in shapes.most_common():
+            if count < repeat_threshold:
+                break
+            logger.warning(f'Possible N+1: {count} x same statement in {_current_route()}\n  {shape}')
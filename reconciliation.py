@@ -0,0 +1,191 @@
+import csv
+from datetime import datetime
+
+import click
+import numpy as np
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import bindparam
+
+from models import (db, Product, ProductSalesDaily, StockCheckpoint, StockReconciliationRun,
+                    StockDiscrepancy)
+from stock_shards import stock_totals, set_product_stock
+
+# ------------------------------------------------------------------------------
+# Stock Reconciliation
+# ------------------------------------------------------------------------------
+# Every product has a checkpoint of its stock and cumulative units sold (from
+# the product_sales_daily counters) as of the last run. Expected stock is the
+# checkpoint stock minus the units sold since. Intentional changes (restocks
+# from the edit form, bulk adjustments) shift the checkpoint through
+# record_stock_adjustment(), so anything else that moves products.quantity
+# shows up as a discrepancy. Each run only looks at products or counters
+# updated since the previous run started, and compares them in NumPy batches.
+
+
+def record_stock_adjustment(product_ids, delta):
+    """Record an intentional stock change so reconciliation expects it.
+
+    ``delta`` is a number or a SQL expression over Product columns (evaluated
+    per product). Products without a checkpoint yet are skipped; their first
+    run takes the stock as found. The caller commits.
+    """
+    if not isinstance(delta, (int, float)):
+        delta = db.session.query(delta).filter(Product.id == StockCheckpoint.product_id).scalar_subquery()
+    StockCheckpoint.query.filter(StockCheckpoint.product_id.in_(product_ids)).update(
+        {'quantity': StockCheckpoint.quantity + delta}, synchronize_session=False
+    )
+
+
+def _changed_product_ids(since):
+    """Products whose stock or sales counters changed since ``since``, plus
+    any product that has never been checkpointed."""
+    if since is None:
+        return sorted(product_id for (product_id,) in db.session.query(Product.id))
+    changed = db.session.query(Product.id).filter(Product.updated_at >= since).union(
+        db.session.query(ProductSalesDaily.product_id).filter(ProductSalesDaily.updated_at >= since),
+        db.session.query(Product.id).filter(~Product.id.in_(db.session.query(StockCheckpoint.product_id)))
+    )
+    return sorted(product_id for (product_id,) in changed)
+
+
+def _units_sold(product_ids):
+    return dict(db.session.query(
+        ProductSalesDaily.product_id, db.func.sum(ProductSalesDaily.units)
+    ).filter(ProductSalesDaily.product_id.in_(product_ids)).group_by(ProductSalesDaily.product_id).all())
+
+
+def _reconcile_batch(product_ids, correct, now):
+    """Compare one batch; returns a list of (product_id, expected, actual, corrected)."""
+    checkpoints = {row.product_id: row for row in StockCheckpoint.query.filter(
+        StockCheckpoint.product_id.in_(product_ids))}
+    sold_now = _units_sold(product_ids)
+    actual_now = stock_totals(product_ids)
+    ids = np.array([product_id for product_id in product_ids if product_id in actual_now], dtype=np.int64)
+    if not len(ids):
+        return []
+
+    actual = np.array([actual_now[i] for i in ids.tolist()], dtype=np.int64)
+    sold = np.array([sold_now.get(i) or 0 for i in ids.tolist()], dtype=np.int64)
+    has_checkpoint = np.array([i in checkpoints for i in ids.tolist()])
+    checkpoint_quantity = np.array([checkpoints[i].quantity if i in checkpoints else 0 for i in ids.tolist()],
+                                   dtype=np.int64)
+    checkpoint_sold = np.array([checkpoints[i].units_sold if i in checkpoints else 0 for i in ids.tolist()],
+                               dtype=np.int64)
+
+    expected = np.where(has_checkpoint, checkpoint_quantity - (sold - checkpoint_sold), actual)
+    mismatched = np.flatnonzero(expected != actual)
+
+    discrepancies = []
+    settled = actual.copy()
+    for i in mismatched.tolist():
+        product_id, target = int(ids[i]), int(max(expected[i], 0))
+        if correct:
+            set_product_stock(db.session.get(Product, product_id), target)
+            settled[i] = target
+        discrepancies.append((product_id, int(expected[i]), int(actual[i]), correct))
+
+    # New checkpoint: the stock we settled on and the units sold it reflects
+    rows = [{'cp_product_id': int(product_id), 'cp_quantity': int(quantity), 'cp_units_sold': int(units)}
+            for product_id, quantity, units in zip(ids.tolist(), settled.tolist(), sold.tolist())]
+    existing = [row for row in rows if row['cp_product_id'] in checkpoints]
+    if existing:
+        table = StockCheckpoint.__table__
+        db.session.execute(
+            table.update().where(table.c.product_id == bindparam('cp_product_id')).values(
+                quantity=bindparam('cp_quantity'), units_sold=bindparam('cp_units_sold'), checked_at=now),
+            existing
+        )
+    new = [{'product_id': row['cp_product_id'], 'quantity': row['cp_quantity'],
+            'units_sold': row['cp_units_sold'], 'checked_at': now}
+           for row in rows if row['cp_product_id'] not in checkpoints]
+    if new:
+        db.session.execute(StockCheckpoint.__table__.insert(), new)
+    return discrepancies
+
+
+def reconcile_stock(correct=False, full=False, batch_size=None):
+    """Check every product changed since the last run (or all with ``full``).
+
+    Discrepancies are recorded on the run; with ``correct`` products.quantity
+    is set back to the expected stock, otherwise the current stock is accepted
+    as the new checkpoint. Commits once per batch. Returns the run.
+    """
+    batch_size = batch_size or current_app.config['STOCK_RECONCILE_BATCH_SIZE']
+    # Only a finished run covered everything changed before it started; an
+    # interrupted one must not move the window forward.
+    last_run = StockReconciliationRun.query.filter(
+        StockReconciliationRun.finished_at.isnot(None)
+    ).order_by(StockReconciliationRun.started_at.desc()).first()
+    # Take the start time before reading anything so changes made during the
+    # run are picked up again next time.
+    run = StockReconciliationRun(started_at=datetime.utcnow(), corrected=correct)
+    product_ids = _changed_product_ids(None if full or last_run is None else last_run.started_at)
+    db.session.add(run)
+    db.session.flush()
+
+    for start in range(0, len(product_ids), batch_size):
+        batch = product_ids[start:start + batch_size]
+        try:
+            discrepancies = _reconcile_batch(batch, correct, run.started_at)
+            if discrepancies:
+                db.session.execute(StockDiscrepancy.__table__.insert(), [
+                    {'run_id': run.id, 'product_id': product_id, 'expected_quantity': expected,
+                     'actual_quantity': actual, 'corrected': corrected}
+                    for product_id, expected, actual, corrected in discrepancies
+                ])
+            run.products_checked += len(batch)
+            run.discrepancies += len(discrepancies)
+            db.session.commit()
+        except Exception:
+            # Undo the failed batch's corrections; the run stays unfinished so
+            # the next one starts again from the last finished run.
+            db.session.rollback()
+            raise
+
+    run.finished_at = datetime.utcnow()
+    db.session.commit()
+    return run
+
+
+def rebase_stock_checkpoints():
+    """Accept current stock and sales counters as correct for every product,
+    e.g. after ``rebuild-product-stats`` recomputed the counters."""
+    StockCheckpoint.query.delete()
+    db.session.commit()
+    return reconcile_stock(full=True)
+
+
+@click.command('reconcile-stock')
+@click.option('--correct', is_flag=True, help='Reset drifted products to their expected stock.')
+@click.option('--full', is_flag=True, help='Check every product, not just those changed since the last run.')
+@click.option('--rebase', is_flag=True, help='Accept all current stock levels as correct and start over.')
+@click.option('--output', type=click.Path(dir_okay=False, writable=True), default=None,
+              help='Write the discrepancy report to this CSV file.')
+@with_appcontext
+def reconcile_stock_command(correct, full, rebase, output):
+    """Compare products' stock against what sales history implies."""
+    run = rebase_stock_checkpoints() if rebase else reconcile_stock(correct=correct, full=full)
+    print(f"🔍 Checked {run.products_checked} products, {run.discrepancies} discrepancies"
+          f"{' corrected' if correct and run.discrepancies else ''}")
+
+    rows = db.session.query(
+        StockDiscrepancy.product_id, Product.name, StockDiscrepancy.expected_quantity,
+        StockDiscrepancy.actual_quantity, StockDiscrepancy.corrected
+    ).outerjoin(Product, Product.id == StockDiscrepancy.product_id).filter(
+        StockDiscrepancy.run_id == run.id
+    ).order_by(StockDiscrepancy.product_id).all()
+    for product_id, name, expected, actual, _ in rows[:20]:
+        print(f"   #{product_id} {name}: expected {expected}, found {actual} ({actual - expected:+d})")
+    if len(rows) > 20:
+        print(f"   ... and {len(rows) - 20} more")
+
+    if output:
+        with open(output, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['product_id', 'name', 'expected_quantity', 'actual_quantity', 'difference', 'corrected'])
+            writer.writerows(
+                (product_id, name, expected, actual, actual - expected, corrected)
+                for product_id, name, expected, actual, corrected in rows
+            )
+        print(f"💾 Discrepancy report written to {output}")
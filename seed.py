@@ -0,0 +1,350 @@
+import random
+from datetime import datetime
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateTable
+
+from models import (db, User, Product, Order, OrderItem, ArchivedOrder, ArchivedOrderItem, Sale, ProductSalesDaily,
+                    ProductSearchToken)
+from product_stats import rebuild_product_sales
+from customers import rebuild_customer_index
+from product_search import rebuild_product_search_index
+
+# ------------------------------------------------------------------------------
+# Database Initialization
+# ------------------------------------------------------------------------------
+
+# Tables recomputed from other data, with the function that fills them. An
+# outdated layout is dropped and rebuilt instead of migrated in place.
+DERIVED_TABLES = {
+    ProductSalesDaily.__table__: rebuild_product_sales,
+    ProductSearchToken.__table__: rebuild_product_search_index,
+}
+
+def _missing_tables(tables):
+    inspector = inspect(db.engine)
+    return [table.name for table in tables if not inspector.has_table(table.name, schema=table.schema)]
+
+def _drop_outdated_derived_tables():
+    """Drop derived tables missing any model column. Returns their names."""
+    inspector = inspect(db.engine)
+    dropped = []
+    for table in DERIVED_TABLES:
+        if not inspector.has_table(table.name, schema=table.schema):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name, schema=table.schema)}
+        if {column.name for column in table.columns} - existing:
+            table.drop(db.engine)
+            dropped.append(table.name)
+    return dropped
+
+def _add_missing_columns(conn):
+    """ALTER TABLE ... ADD COLUMN for model columns an older database lacks.
+
+    Returns the added columns as ``table.column`` strings.
+    """
+    inspector = inspect(conn)
+    added = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name, schema=table.schema):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name, schema=table.schema)}
+        qualified = f'{table.schema}.{table.name}' if table.schema else table.name
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                raise RuntimeError(f'Cannot add NOT NULL column {qualified}.{column.name}; reseed instead')
+            ddl = f'ALTER TABLE {qualified} ADD COLUMN {column.name} {column.type.compile(dialect=conn.dialect)}'
+            for foreign_key in column.foreign_keys:
+                ddl += f' REFERENCES {foreign_key.column.table.name} ({foreign_key.column.name})'
+            conn.execute(text(ddl))
+            added.append(f'{table.name}.{column.name}')
+    return added
+
+def _rebuild_with_autoincrement(conn, table, archived_table):
+    """Recreate a SQLite table created before it was declared AUTOINCREMENT.
+
+    Without AUTOINCREMENT SQLite reuses the highest rowid once that row is
+    deleted, so a new live order could take the id of one just archived. The
+    sequence starts past the highest live and archived id.
+    """
+    rebuild = f'{table.name}_rebuild'
+    create_sql = str(CreateTable(table).compile(dialect=conn.dialect))
+    conn.execute(text(create_sql.replace(f'CREATE TABLE {table.name} ', f'CREATE TABLE {rebuild} ', 1)))
+    columns = ', '.join(column.name for column in table.columns)
+    conn.execute(text(f'INSERT INTO {rebuild} ({columns}) SELECT {columns} FROM {table.name}'))
+    conn.execute(text(f'DROP TABLE {table.name}'))
+    conn.execute(text(f'ALTER TABLE {rebuild} RENAME TO {table.name}'))
+    for index in table.indexes:
+        index.create(conn)
+    conn.execute(text('DELETE FROM sqlite_sequence WHERE name IN (:name, :rebuild)'),
+                 {'name': table.name, 'rebuild': rebuild})
+    conn.execute(text(
+        f'INSERT INTO sqlite_sequence (name, seq) SELECT :name, MAX('
+        f'(SELECT COALESCE(MAX(id), 0) FROM main.{table.name}), '
+        f'(SELECT COALESCE(MAX(id), 0) FROM {archived_table.schema}.{archived_table.name}))'
+    ), {'name': table.name})
+
+def upgrade_database():
+    """Bring an existing database up to the current models without losing data.
+
+    Creates missing tables, adds missing columns and indexes, rebuilds live
+    order tables that predate AUTOINCREMENT, fills new or outdated derived
+    tables and backfills the customer index when orders.customer_id is new.
+    Safe to run repeatedly.
+    """
+    recomputed = _drop_outdated_derived_tables()
+    recomputed += _missing_tables(DERIVED_TABLES)
+    db.create_all()
+    with db.engine.begin() as conn:
+        added = _add_missing_columns(conn)
+        rebuilt = []
+        if conn.dialect.name == 'sqlite':
+            for table, archived_table in ((Order.__table__, ArchivedOrder.__table__),
+                                          (OrderItem.__table__, ArchivedOrderItem.__table__)):
+                table_sql = conn.execute(text(
+                    "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"
+                ), {'name': table.name}).scalar()
+                if table_sql and 'AUTOINCREMENT' not in table_sql.upper():
+                    _rebuild_with_autoincrement(conn, table, archived_table)
+                    rebuilt.append(table.name)
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+    for table, rebuild in DERIVED_TABLES.items():
+        if table.name in recomputed:
+            rebuild()
+    if 'orders.customer_id' in added:
+        rebuild_customer_index()
+    return added, rebuilt, recomputed
+
+def seed_database():
+    """Drop and recreate every table, then load the demo data.
+
+    Must be called inside an application context.
+    """
+    # Drop all tables and recreate them to ensure schema matches models
+    print("🔄 Recreating database tables...")
+    db.drop_all()
+    db.create_all()
+    print("✅ Created new database with all tables")
+    
+    # Create default user
+    print("📝 Creating default user...")
+    default_user = User(
+        name='Demo User',
+        email='demo@example.com',
+        image_url=None
+    )
+    default_user.set_password('password123')
+    db.session.add(default_user)
+    db.session.commit()
+    
+    # Create sample products
+    print("📦 Creating sample products...")
+    sample_products = [
+        Product(name='MacBook Pro 16"', category='Electronics', price=2499.99, quantity=15, 
+               description='High-performance laptop for professionals with M2 Pro chip'),
+        Product(name='iMac 24"', category='Electronics', price=1299.99, quantity=8, 
+               description='All-in-one desktop computer with 4.5K display'),
+        Product(name='iPad Pro 12.9"', category='Electronics', price=1099.99, quantity=25, 
+               description='Professional tablet with M2 chip and Liquid Retina XDR display'),
+        Product(name='MacBook Air 13"', category='Electronics', price=999.99, quantity=20, 
+               description='Lightweight and powerful laptop with M2 chip'),
+        Product(name='iPhone 15 Pro', category='Electronics', price=999.99, quantity=50, 
+               description='Latest smartphone with titanium design and advanced camera'),
+        Product(name='AirPods Pro (2nd Gen)', category='Electronics', price=249.99, quantity=75, 
+               description='Wireless noise-cancelling earbuds with MagSafe Charging Case'),
+        Product(name='Apple Watch Series 9', category='Electronics', price=399.99, quantity=30, 
+               description='Advanced smartwatch with health tracking and S9 chip'),
+        Product(name='Gaming Laptop RTX 4070', category='Electronics', price=1799.99, quantity=8, 
+               description='High-performance gaming laptop with RGB keyboard and 144Hz display'),
+        Product(name='Premium Cotton T-Shirt', category='Clothing', price=29.99, quantity=45, 
+               description='Comfortable 100% organic cotton t-shirt in various colors'),
+        Product(name='Python Programming Book', category='Books', price=39.99, quantity=25, 
+               description='Complete guide to Python programming from beginner to advanced'),
+        Product(name='Wireless Mechanical Keyboard', category='Electronics', price=129.99, quantity=15, 
+               description='Mechanical keyboard with RGB lighting and wireless connectivity'),
+        Product(name='Noise Cancelling Headphones', category='Electronics', price=299.99, quantity=12, 
+               description='Over-ear headphones with active noise cancellation'),
+        Product(name='Fitness Tracker Watch', category='Electronics', price=79.99, quantity=35, 
+               description='Waterproof fitness tracker with heart rate monitoring'),
+        Product(name='Desk Lamp with Wireless Charger', category='Home', price=89.99, quantity=20, 
+               description='LED desk lamp with built-in wireless charging pad'),
+        Product(name='Stainless Steel Water Bottle', category='Home', price=24.99, quantity=60, 
+               description='Insulated stainless steel water bottle, keeps drinks cold for 24 hours'),
+    ]
+    
+    for product in sample_products:
+        db.session.add(product)
+    
+    db.session.flush()  # Get product IDs
+    
+    # Create sample orders
+    print("🛒 Creating sample orders...")
+    sample_orders_data = [
+        {
+            'order_id': 'ORD202401001',
+            'customer_name': 'John Smith',
+            'customer_email': 'john.smith@email.com',
+            'customer_phone': '+1-555-0101',
+            'order_date': datetime(2024, 1, 15),
+            'amount': 3749.98,
+            'status': 'Delivered',
+            'tracking_number': 'TRK789456123',
+            'shipping_address': '123 Main Street, Apt 4B\nNew York, NY 10001\nUnited States',
+            'notes': 'Customer requested signature confirmation',
+            'items': [
+                {'product_id': 1, 'quantity': 1},  # MacBook Pro 16"
+                {'product_id': 5, 'quantity': 1}   # iPhone 15 Pro
+            ]
+        },
+        {
+            'order_id': 'ORD202401002', 
+            'customer_name': 'Sarah Johnson',
+            'customer_email': 'sarah.j@email.com',
+            'customer_phone': '+1-555-0102',
+            'order_date': datetime(2024, 1, 18),
+            'amount': 1099.99,
+            'status': 'Shipped',
+            'tracking_number': 'TRK789456124',
+            'shipping_address': '456 Oak Avenue\nLos Angeles, CA 90210\nUnited States',
+            'notes': 'Gift wrapping requested',
+            'items': [
+                {'product_id': 3, 'quantity': 1}   # iPad Pro
+            ]
+        },
+        {
+            'order_id': 'ORD202401003',
+            'customer_name': 'Mike Wilson',
+            'customer_email': 'mike.wilson@email.com', 
+            'customer_phone': '+1-555-0103',
+            'order_date': datetime(2024, 1, 20),
+            'amount': 648.97,
+            'status': 'Processing',
+            'tracking_number': '',
+            'shipping_address': '789 Pine Road\nChicago, IL 60601\nUnited States',
+            'notes': 'Customer will pick up from store',
+            'items': [
+                {'product_id': 6, 'quantity': 2},  # AirPods Pro
+                {'product_id': 10, 'quantity': 1}   # Python Book
+            ]
+        },
+        {
+            'order_id': 'ORD202401004',
+            'customer_name': 'Emily Davis',
+            'customer_email': 'emily.davis@email.com',
+            'customer_phone': '+1-555-0104',
+            'order_date': datetime(2024, 1, 22),
+            'amount': 999.99,
+            'status': 'Pending',
+            'tracking_number': '',
+            'shipping_address': '321 Elm Street\nHouston, TX 77001\nUnited States',
+            'notes': 'Waiting for payment confirmation',
+            'items': [
+                {'product_id': 4, 'quantity': 1}   # MacBook Air
+            ]
+        },
+        {
+            'order_id': 'ORD202401005',
+            'customer_name': 'Robert Brown',
+            'customer_email': 'robert.b@email.com',
+            'customer_phone': '+1-555-0105',
+            'order_date': datetime(2024, 1, 25),
+            'amount': 399.99,
+            'status': 'Delivered',
+            'tracking_number': 'TRK789456125',
+            'shipping_address': '654 Maple Drive\nPhoenix, AZ 85001\nUnited States',
+            'notes': 'Left at front door as requested',
+            'items': [
+                {'product_id': 7, 'quantity': 1}   # Apple Watch
+            ]
+        }
+    ]
+    
+    for order_data in sample_orders_data:
+        order = Order(
+            order_id=order_data['order_id'],
+            customer_name=order_data['customer_name'],
+            customer_email=order_data['customer_email'],
+            customer_phone=order_data['customer_phone'],
+            order_date=order_data['order_date'],
+            amount=order_data['amount'],
+            status=order_data['status'],
+            tracking_number=order_data['tracking_number'],
+            shipping_address=order_data['shipping_address'],
+            notes=order_data['notes']
+        )
+        db.session.add(order)
+        db.session.flush()
+        
+        # Add order items and update product quantities
+        for item_data in order_data['items']:
+            product = Product.query.get(item_data['product_id'])
+            if product:
+                order_item = OrderItem(
+                    order_id=order.id,
+                    product_id=item_data['product_id'],
+                    quantity=item_data['quantity'],
+                    unit_price=product.price
+                )
+                db.session.add(order_item)
+                
+                # Update product stock (only for delivered/processing orders)
+                if order_data['status'] in ['Delivered', 'Shipped', 'Processing']:
+                    product.quantity -= item_data['quantity']
+    
+    # Create sample sales data
+    print("📈 Creating sample sales data...")
+    for product in sample_products[:10]:  # Only for first 10 products
+        for i in range(random.randint(3, 8)):
+            sale = Sale(
+                product_id=product.id,
+                quantity_sold=random.randint(1, 3),
+                sale_price=product.price * random.uniform(0.85, 0.95),
+                sale_date=datetime(2024, 1, random.randint(1, 31))
+            )
+            db.session.add(sale)
+    
+    # Commit everything
+    db.session.commit()
+    rebuild_product_sales()
+    rebuild_customer_index()
+    rebuild_product_search_index()
+    
+    print("\n✅ Database initialization complete!")
+    print("📊 Sample data created:")
+    print(f"   👤 Users: {User.query.count()}")
+    print(f"   📦 Products: {Product.query.count()}")
+    print(f"   🛒 Orders: {Order.query.count()}")
+    print(f"   📈 Sales: {Sale.query.count()}")
+    print(f"   📋 Order Items: {OrderItem.query.count()}")
+    
+    print("\n🔑 Demo credentials:")
+    print("   Email: demo@example.com")
+    print("   Password: password123")
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create or upgrade the schema without touching existing data."""
+    added, rebuilt, recomputed = upgrade_database()
+    for column in added:
+        print(f"➕ Added column {column}")
+    for table in rebuilt:
+        print(f"🔁 Rebuilt {table} with AUTOINCREMENT ids")
+    for table in recomputed:
+        print(f"🔁 Recomputed {table}")
+    print("✅ Database schema is up to date")
+
+
+@click.command('seed-db')
+@with_appcontext
+def seed_db_command():
+    """Drop all tables and reload the demo data."""
+    seed_database()
@@ -0,0 +1,74 @@
+// Customer autocomplete for the order forms.
+// Queries /customers/search as the user types into the name or email field and
+// fills name, email and phone from the chosen customer.
+function attachCustomerAutocomplete(nameInput, emailInput, phoneInput) {
+    let debounceTimer = null;
+    let activeInput = null;
+
+    const dropdown = document.createElement('div');
+    dropdown.className = 'absolute z-40 w-full mt-1 bg-white border border-gray-200 rounded-xl shadow-lg hidden max-h-72 overflow-y-auto';
+
+    function hideDropdown() {
+        dropdown.classList.add('hidden');
+    }
+
+    function showResults(customers) {
+        dropdown.innerHTML = '';
+        if (customers.length === 0) {
+            hideDropdown();
+            return;
+        }
+        customers.forEach(customer => {
+            const option = document.createElement('button');
+            option.type = 'button';
+            option.className = 'w-full text-left px-4 py-3 hover:bg-blue-50 flex justify-between items-center';
+            option.innerHTML = `
+                <span>
+                    <span class="font-medium text-gray-900"></span>
+                    <span class="block text-sm text-gray-500"></span>
+                </span>
+                <span class="text-xs text-gray-500">${customer.order_count} orders • $${customer.lifetime_value.toFixed(2)}</span>
+            `;
+            option.querySelector('.font-medium').textContent = customer.name;
+            option.querySelector('.text-sm').textContent = customer.email || customer.phone || '';
+            option.addEventListener('mousedown', event => {
+                event.preventDefault();
+                nameInput.value = customer.name;
+                if (emailInput) emailInput.value = customer.email || '';
+                if (phoneInput && customer.phone) phoneInput.value = customer.phone;
+                hideDropdown();
+            });
+            dropdown.appendChild(option);
+        });
+        activeInput.parentNode.appendChild(dropdown);
+        dropdown.classList.remove('hidden');
+    }
+
+    function onInput(event) {
+        activeInput = event.target;
+        activeInput.parentNode.classList.add('relative');
+        const query = activeInput.value.trim();
+        clearTimeout(debounceTimer);
+        if (query.length < 2) {
+            hideDropdown();
+            return;
+        }
+        debounceTimer = setTimeout(() => {
+            fetch(`/customers/search?q=${encodeURIComponent(query)}&limit=8`)
+                .then(response => response.json())
+                .then(data => {
+                    if (data.success && activeInput.value.trim() === query) {
+                        showResults(data.customers);
+                    }
+                })
+                .catch(error => console.error('Error:', error));
+        }, 200);
+    }
+
+    [nameInput, emailInput].forEach(input => {
+        if (!input) return;
+        input.setAttribute('autocomplete', 'off');
+        input.addEventListener('input', onInput);
+        input.addEventListener('blur', hideDropdown);
+    });
+}
@@ -0,0 +1,182 @@
+import random
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy.orm.attributes import set_committed_value
+
+from models import db, Product, ProductStockShard
+
+# ------------------------------------------------------------------------------
+# Sharded Stock Counters
+# ------------------------------------------------------------------------------
+# Hot products can have their stock split across N product_stock_shards rows.
+# A reservation decrements one shard (picked at random among those with enough
+# stock) with a conditional UPDATE, so concurrent orders for the same SKU no
+# longer all queue on the single products row. Exact stock is the sum of the
+# shards; products.quantity for a sharded product is a snapshot refreshed by
+# sync_sharded_totals() (the ``sync-stock-shards`` command) and on re-split.
+# Products without shard rows behave exactly as before.
+
+ID_BATCH_SIZE = 500
+
+
+def _split(total, shards):
+    base, extra = divmod(max(total, 0), shards)
+    return [base + (1 if i < extra else 0) for i in range(shards)]
+
+def stock_totals(product_ids, session=None):
+    """Exact stock for each product id: the shard sum for sharded products."""
+    session = session or db.session
+    product_ids = list(product_ids)
+    totals = {}
+    for start in range(0, len(product_ids), ID_BATCH_SIZE):
+        batch = product_ids[start:start + ID_BATCH_SIZE]
+        totals.update(session.query(Product.id, Product.quantity).filter(Product.id.in_(batch)).all())
+        totals.update(session.query(
+            ProductStockShard.product_id, db.func.sum(ProductStockShard.quantity)
+        ).filter(ProductStockShard.product_id.in_(batch)).group_by(ProductStockShard.product_id).all())
+    return totals
+
+def exact_stock():
+    """SQL expression for a product's exact stock, for filters and ordering:
+    the shard sum for sharded products, products.quantity otherwise."""
+    shard_total = db.select(db.func.sum(ProductStockShard.quantity)).where(
+        ProductStockShard.product_id == Product.id
+    ).scalar_subquery()
+    return db.func.coalesce(shard_total, Product.quantity)
+
+def shard_counts(product_ids):
+    """Number of stock shards for each sharded product among ``product_ids``."""
+    return dict(db.session.query(ProductStockShard.product_id, db.func.count(ProductStockShard.id)).filter(
+        ProductStockShard.product_id.in_(list(product_ids))
+    ).group_by(ProductStockShard.product_id).all())
+
+def load_exact_stock(products, session=None):
+    """Overwrite the loaded quantity of sharded products with their exact
+    totals, without marking them dirty."""
+    totals = stock_totals([product.id for product in products], session)
+    for product in products:
+        if product.id in totals and totals[product.id] != product.quantity:
+            set_committed_value(product, 'quantity', totals[product.id])
+    return products
+
+def shard_product_stock(product_id, shards):
+    """Split a product's current stock across ``shards`` rows.
+
+    Re-splits an already sharded product; ``shards`` <= 1 turns sharding off
+    and folds the stock back into products.quantity. The caller commits.
+    """
+    total = stock_totals([product_id]).get(product_id, 0)
+    ProductStockShard.query.filter_by(product_id=product_id).delete(synchronize_session=False)
+    if shards > 1:
+        db.session.execute(ProductStockShard.__table__.insert(), [
+            {'product_id': product_id, 'shard': shard, 'quantity': quantity}
+            for shard, quantity in enumerate(_split(total, shards))
+        ])
+    Product.query.filter_by(id=product_id).update({'quantity': total}, synchronize_session=False)
+    return total
+
+def set_product_stock(product, quantity):
+    """Set a product's absolute stock (e.g. from the edit form). The caller commits."""
+    product.quantity = quantity
+    shards = ProductStockShard.query.filter_by(product_id=product.id).order_by(ProductStockShard.shard).all()
+    if not shards:
+        return
+    for shard, shard_quantity in zip(shards, _split(quantity, len(shards))):
+        shard.quantity = shard_quantity
+
+def reserve_stock(product, quantity):
+    """Take ``quantity`` units of ``product`` if available.
+
+    Returns False when there isn't enough stock; the caller must then roll
+    back, which also undoes any partial decrement.
+    """
+    shards = db.session.query(ProductStockShard.id, ProductStockShard.quantity).filter(
+        ProductStockShard.product_id == product.id
+    ).all()
+    if not shards:
+        # Conditional decrement: no window between the stock check and the write
+        updated = Product.query.filter(
+            Product.id == product.id, Product.quantity >= quantity
+        ).update({'quantity': Product.quantity - quantity}, synchronize_session='evaluate')
+        return updated == 1
+
+    random.shuffle(shards)
+    # Prefer a single shard that covers the whole request...
+    for shard_id, available in shards:
+        if available >= quantity and _take_from_shard(shard_id, quantity):
+            return True
+    # ...otherwise drain several; a shortfall is undone by the caller's rollback
+    remaining = quantity
+    for shard_id, available in shards:
+        take = min(remaining, available)
+        if take > 0 and _take_from_shard(shard_id, take):
+            remaining -= take
+        if remaining == 0:
+            return True
+    return False
+
+def _take_from_shard(shard_id, quantity):
+    return ProductStockShard.query.filter(
+        ProductStockShard.id == shard_id, ProductStockShard.quantity >= quantity
+    ).update({'quantity': ProductStockShard.quantity - quantity}, synchronize_session=False) == 1
+
+def release_stock(product, quantity):
+    """Return ``quantity`` units to stock (cancelled or deleted orders)."""
+    shard_ids = [shard_id for (shard_id,) in db.session.query(ProductStockShard.id).filter(
+        ProductStockShard.product_id == product.id
+    )]
+    if not shard_ids:
+        # SQL-side increment so concurrent releases and reservations don't lose updates
+        Product.query.filter_by(id=product.id).update(
+            {'quantity': Product.quantity + quantity}, synchronize_session='evaluate'
+        )
+        return
+    ProductStockShard.query.filter_by(id=random.choice(shard_ids)).update(
+        {'quantity': ProductStockShard.quantity + quantity}, synchronize_session=False
+    )
+
+def sync_sharded_totals(product_ids=None):
+    """Refresh products.quantity from the shard sums (for ``product_ids``, or
+    every sharded product). Returns products synced. The caller commits."""
+    shard_total = db.session.query(db.func.sum(ProductStockShard.quantity)).filter(
+        ProductStockShard.product_id == Product.id
+    ).scalar_subquery()
+    query = Product.query.filter(Product.id.in_(db.session.query(ProductStockShard.product_id)))
+    if product_ids is not None:
+        query = query.filter(Product.id.in_(product_ids))
+    return query.update({'quantity': shard_total}, synchronize_session=False)
+
+def respread_shards(product_ids):
+    """Re-split products.quantity across each product's existing shards, after
+    products.quantity was changed directly. The caller commits."""
+    for product in Product.query.filter(
+        Product.id.in_(db.session.query(ProductStockShard.product_id)),
+        Product.id.in_(product_ids)
+    ):
+        set_product_stock(product, product.quantity)
+
+
+@click.command('shard-stock')
+@click.argument('product_id', type=int)
+@click.argument('shards', type=int)
+@with_appcontext
+def shard_stock_command(product_id, shards):
+    """Split PRODUCT_ID's stock across SHARDS counter rows (1 turns sharding off)."""
+    if Product.query.get(product_id) is None:
+        raise click.ClickException(f'Product {product_id} not found')
+    total = shard_product_stock(product_id, shards)
+    db.session.commit()
+    if shards > 1:
+        print(f"🧩 Product {product_id}: {total} units split across {shards} shards")
+    else:
+        print(f"🧩 Product {product_id}: sharding off, {total} units")
+
+
+@click.command('sync-stock-shards')
+@with_appcontext
+def sync_stock_shards_command():
+    """Refresh products.quantity for sharded products from their shard sums."""
+    synced = sync_sharded_totals()
+    db.session.commit()
+    print(f"🧩 Synced stock totals for {synced} sharded products")